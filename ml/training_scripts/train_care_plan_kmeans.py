@@ -7,6 +7,7 @@ from sklearn.decomposition import PCA
 import matplotlib.pyplot as plt
 import seaborn as sns
 import joblib
+import json
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -602,6 +603,21 @@ class CarePlanKMeansModel:
         os.makedirs(os.path.dirname(model_path), exist_ok=True)
         joblib.dump(model_data, model_path)
         print(f"✅ Care Plan K-means model saved to {model_path}")
+        
+        # Pickle-free export of the arrays the server needs for nearest-centroid prediction
+        npz_path = Path(model_path).with_suffix('.npz')
+        np.savez(
+            npz_path,
+            centers=self.kmeans_model.cluster_centers_,
+            scaler_mean=self.scaler.mean_,
+            scaler_scale=self.scaler.scale_,
+            cluster_profiles=json.dumps(
+                {str(k): v for k, v in self.cluster_profiles.items()},
+                default=lambda o: o.item() if hasattr(o, 'item') else str(o)
+            ),
+            **{f'classes_{name}': np.asarray(le.classes_, dtype=str) for name, le in self.label_encoders.items()}
+        )
+        print(f"✅ Care Plan K-means arrays saved to {npz_path}")
     
     def load_model(self, model_path):
         """Load a saved model"""
@@ -3,7 +3,8 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
 import os
-from .utils.database import mongo
+from .utils.database import mongo, check_server_version
+from .utils.log_config import configure_logging
 from flask import request, jsonify
 from datetime import timedelta
 
@@ -11,6 +12,7 @@ jwt = JWTManager()
 
 def create_app():
     load_dotenv()
+    configure_logging()
     app = Flask(__name__)
     
     # Configuration
@@ -35,10 +37,33 @@ def create_app():
         return response
 
     
+    # Warn early if the server lacks the aggregation stages the models rely on
+    check_server_version()
+
     # Initialize roles
     from .models.role import Role
     Role.initialize_default_roles()
 
+    # Ensure indexes for the hot query paths
+    from .models.breastfeeding import BreastfeedingModel
+    BreastfeedingModel.ensure_indexes()
+    from .models.care_plan import CarePlan
+    CarePlan.ensure_indexes()
+    from .models.daily_checkin import DailyCheckin
+    DailyCheckin.ensure_indexes()
+    from .models.patient_record import PatientRecord
+    PatientRecord.ensure_indexes()
+    from .models.ppd_assessment import PPDAssessment
+    PPDAssessment.ensure_indexes()
+    from .models.user import User
+    User.ensure_indexes()
+    Role.ensure_indexes()
+    from .models.user_assignment import UserAssignment
+    UserAssignment.ensure_indexes()
+    from .models.symptom_tracking import SymptomTracking
+    SymptomTracking.ensure_indexes()
+    CarePlan.preload_model()
+
     # Register blueprints
     from .routes.auth_routes import auth_bp
     from .routes.dashboard_routes import dashboard_bp
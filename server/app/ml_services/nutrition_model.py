@@ -4,11 +4,19 @@ from sklearn.preprocessing import LabelEncoder, MinMaxScaler
 import joblib
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 
+# Try to use hummingbird if available to run the forest as batched tensor ops
+try:
+    from hummingbird.ml import convert as _hb_convert  # type: ignore
+except Exception:
+    _hb_convert = None
+
 class NutritionModel:
     def __init__(self):
         self.model = None
+        self.compiled_model = None # Tensor-compiled copy of self.model, if hummingbird is installed
         self.scaler = None
         self.label_encoders = None # Will load from file
         self.feature_names = [
@@ -95,7 +103,8 @@ class NutritionModel:
 
         # Predict probabilities and return the probabilities for the first (and likely only) sample
         try:
-            predictions = self.model.predict_proba(processed_data)[0]
+            estimator = self.compiled_model if self.compiled_model is not None else self.model
+            predictions = estimator.predict_proba(processed_data)[0]
             print(f"✅ Prediction successful. Probabilities: {predictions}", file=sys.stderr)
             return predictions
         except Exception as e:
@@ -120,22 +129,28 @@ class NutritionModel:
         print(f"Attempting to load encoders from: {encoders_path}", file=sys.stderr)
 
         try:
-            if os.path.exists(model_path):
-                self.model = joblib.load(model_path)
+            # The three artifacts are independent; unpickle them concurrently
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                model_future = executor.submit(joblib.load, model_path) if os.path.exists(model_path) else None
+                scaler_future = executor.submit(joblib.load, scaler_path) if os.path.exists(scaler_path) else None
+                encoders_future = executor.submit(joblib.load, encoders_path) if os.path.exists(encoders_path) else None
+
+            if model_future is not None:
+                self.model = model_future.result()
                 print(f"✅ Nutrition model loaded successfully from {model_path}", file=sys.stderr)
             else:
                 print(f"⚠️ Nutrition model file not found at {model_path}. Ensure train_and_save_nutrition_model.py has been run.", file=sys.stderr)
                 self.model = None
 
-            if os.path.exists(scaler_path):
-                self.scaler = joblib.load(scaler_path)
+            if scaler_future is not None:
+                self.scaler = scaler_future.result()
                 print(f"✅ Nutrition scaler loaded successfully from {scaler_path}", file=sys.stderr)
             else:
                 print(f"⚠️ Nutrition scaler file not found at {scaler_path}. Ensure train_and_save_nutrition_model.py has been run.", file=sys.stderr)
                 self.scaler = None
 
-            if os.path.exists(encoders_path):
-                self.label_encoders = joblib.load(encoders_path)
+            if encoders_future is not None:
+                self.label_encoders = encoders_future.result()
                 print(f"✅ Nutrition encoders loaded successfully from {encoders_path}", file=sys.stderr)
             else:
                 print(f"⚠️ Nutrition encoders file not found at {encoders_path}. Ensure train_and_save_nutrition_model.py has been run.", file=sys.stderr)
@@ -147,3 +162,17 @@ class NutritionModel:
             self.scaler = None
             self.label_encoders = None
 
+        self.compiled_model = self.compile_model(self.model)
+
+    def compile_model(self, model):
+        """Convert the tree ensemble to hummingbird's torch backend; None keeps sklearn inference"""
+        if model is None or _hb_convert is None:
+            return None
+        try:
+            compiled = _hb_convert(model, 'torch')
+            print("✅ Nutrition model compiled with hummingbird (torch backend)", file=sys.stderr)
+            return compiled
+        except Exception as e:
+            print(f"⚠️ Could not compile nutrition model, using sklearn inference: {e}", file=sys.stderr)
+            return None
+
@@ -1,18 +1,36 @@
+import threading
 import joblib
+import numpy as np
 from pathlib import Path
 
 class PPDAnalyzer:
     def __init__(self, model_version="latest"):
         model_dir = Path(__file__).resolve().parent.parent.parent / "ml" / "models"
-        
+
         if model_version == "latest":
             model_files = list(model_dir.glob("ppd_model_v*.pkl"))
             model_path = max(model_files, key=lambda x: x.stat().st_mtime)
         else:
             model_path = model_dir / f"ppd_model_v{model_version}.pkl"
-            
+
         self.model = joblib.load(model_path)
+        # Single-row inference gains nothing from joblib worker fan-out
+        if hasattr(self.model, "n_jobs"):
+            self.model.n_jobs = 1
+        self.n_features = getattr(self.model, "n_features_in_", None)
+        # Per-thread (1, n_features) input buffer, reused across predict calls
+        self._local = threading.local()
         print(f"✅ Loaded model: {model_path.name}")
 
+    def _input_buffer(self):
+        buf = getattr(self._local, "buf", None)
+        if buf is None:
+            buf = self._local.buf = np.empty((1, self.n_features), dtype=np.float64)
+        return buf
+
     def predict(self, input_data):
-        return self.model.predict_proba([input_data])[0][1]  # Returns PPD probability
\ No newline at end of file
+        if self.n_features is None:
+            return self.model.predict_proba([input_data])[0][1]
+        buf = self._input_buffer()
+        np.copyto(buf[0], input_data)
+        return self.model.predict_proba(buf)[0, 1]  # Returns PPD probability
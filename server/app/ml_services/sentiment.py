@@ -1,4 +1,6 @@
+import functools
 import math
+import re
 from typing import Dict
 
 # Try to use vaderSentiment if available (preferred as it bundles the lexicon)
@@ -18,34 +20,43 @@ _POS = set([
     'proud','grateful','supported','encouraged','strong','confident','peaceful','loved',
 ])
 
+# Whole-word alternations so each lexicon is matched in a single scan of the text
+_NEG_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, sorted(_NEG))) + r')\b')
+_POS_RE = re.compile(r'\b(?:' + '|'.join(map(re.escape, sorted(_POS))) + r')\b')
+
 
 def _fallback_score(text: str) -> float:
     if not text:
         return 0.0
     t = text.lower()
-    pos = sum(w in t for w in _POS)
-    neg = sum(w in t for w in _NEG)
+    pos = len(_POS_RE.findall(t))
+    neg = len(_NEG_RE.findall(t))
     if pos == 0 and neg == 0:
         return 0.0
     raw = (pos - neg) / max(1, (pos + neg))  # range ~[-1,1]
     return max(-1.0, min(1.0, raw))
 
 
+@functools.lru_cache(maxsize=4096)
+def _score_text(text: str) -> float:
+    # Short journal/chat entries repeat often ("okay", "fine today"); memoize their scores
+    try:
+        if _vader is not None:
+            return float(_vader.polarity_scores(text).get('compound', 0.0))
+        return _fallback_score(text)
+    except Exception:
+        return _fallback_score(text)
+
+
 def analyze_sentiment(text: str) -> Dict:
     """
     Returns a dict with fields:
       - score: float in [-1,1]
       - label: 'negative'|'neutral'|'positive'
     """
-    score = 0.0
-    try:
-        if _vader is not None:
-            vs = _vader.polarity_scores(text or '')
-            score = float(vs.get('compound', 0.0))
-        else:
-            score = _fallback_score(text or '')
-    except Exception:
-        score = _fallback_score(text or '')
+    if not text or not text.strip():
+        return {'score': 0.0, 'label': 'neutral'}
+    score = _score_text(text)
 
     # Label mapping similar to VADER defaults
     if score >= 0.05:
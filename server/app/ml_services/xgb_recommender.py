@@ -1,6 +1,8 @@
+import functools
 import os
+import re
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
 import joblib
@@ -18,6 +20,81 @@ POSTPARTUM_RDA = {
     'Energy': {'target': 2640, 'unit': 'kcal', 'critical': True}
 }
 
+
+def _compile_terms(*groups: List[str]) -> re.Pattern:
+    """Compile word lists into a single alternation so each text is scanned once."""
+    terms = dict.fromkeys(t for group in groups for t in group)
+    return re.compile('|'.join(re.escape(t) for t in terms))
+
+
+_RED_MEAT = ['beef','pork','mutton','lamb','veal','bacon','ham','pepperoni','salami','sausage','meat']
+_POULTRY = ['chicken','turkey','duck','quail']
+_SEAFOOD = [
+    'fish','seafood','prawn','shrimp','crab','lobster','oyster','mussel','clam','squid','octopus',
+    'anchovy','salmon','tuna','sardine','mackerel','cod','tilapia','trout','snapper','eel'
+]
+_EGGS = ['egg','eggs','yolk','albumen']
+
+# Substrings that exclude a food for a given diet (matched on description + category)
+DIET_BANNED = {
+    'vegetarian': _compile_terms(
+        _RED_MEAT, _POULTRY, _SEAFOOD,
+        # eggs and animal derivatives (common vegetarian exclusion)
+        _EGGS, ['gelatin','gelatine','lard']
+    ),
+    # Exclude red meat and poultry; allow fish/seafood; eggs allowed
+    'pescatarian': _compile_terms(
+        _RED_MEAT,
+        ['beef product','pork product','beef products','pork products','beef flavor','pork flavor','meat flavor'],
+        _POULTRY, ['chicken flavor','poultry']
+    ),
+    'vegan': _compile_terms(
+        _RED_MEAT, _POULTRY, _SEAFOOD, _EGGS,
+        ['milk','curd','paneer','cheese','butter','ghee','yogurt','yoghurt','whey'],
+        # other animal products
+        ['gelatin','gelatine','honey','lard']
+    ),
+}
+
+ALLERGY_BANNED = {
+    'milk': _compile_terms(['milk','curd','paneer','cheese','butter','ghee','yogurt']),
+    'nuts': _compile_terms(['nut','almond','walnut','peanut','cashew']),
+    'gluten': _compile_terms(['wheat','barley','rye','bread','roti','chapati','paratha']),
+}
+
+INDIAN_TERMS = _compile_terms(
+    # staples and grains
+    ['basmati','rice','millet','ragi','jowar','bajra'],
+    # legumes/pulses
+    ['lentil','lentils','chickpea','chickpeas','garbanzo','rajma','kidney bean','moong','urad','masoor'],
+    # dishes and forms
+    ['dal','khichdi','poha','upma','idli','dosa','sambar','rasam','biryani','pulao','paratha','chapati','roti','sabzi','curry'],
+    # vegetables often in indian cooking
+    ['spinach','palak','saag','cauliflower','gobi','okra','bhindi','eggplant','brinjal','baingan','methi'],
+    # spices/herbs (as hints)
+    ['turmeric','curry powder','coriander','cumin','fenugreek','mustard seed','cardamom','clove','cinnamon'],
+)
+
+SEAFOOD_TERMS = _compile_terms(_SEAFOOD)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except Exception:
+        return None
+
+
+def _normalize_user(user: Dict[str, Any]) -> Dict[str, Any]:
+    """Canonical lowercased view of the profile fields recommend() reads."""
+    return {
+        'diet': str(user.get('dietType', '')).lower(),
+        'cuisine': str(user.get('preferredCuisine', '')).lower(),
+        'allergies': tuple(a.strip().lower() for a in str(user.get('allergies', '')).split(',') if a.strip()),
+        'sent_avg': _to_float(user.get('sent_last7_avg')),
+    }
+
+
 class XGBNutritionRecommender:
     def __init__(self) -> None:
         # Resolve project root and paths
@@ -26,15 +103,27 @@ class XGBNutritionRecommender:
         self.model_path = current_dir / 'ml' / 'models' / 'nutrition_model.joblib'
 
         self.bundle = None
-        self.food_df: pd.DataFrame | None = None
+        # Nutrient features as a contiguous (N, F) float32 matrix; display metadata kept alongside
+        self._X: np.ndarray | None = None
+        self._meta: pd.DataFrame | None = None
         self.features: List[str] = list(POSTPARTUM_RDA.keys())
+        self._targets = np.array([POSTPARTUM_RDA[f]['target'] for f in self.features], dtype=float)
+        self._units = [POSTPARTUM_RDA[f]['unit'] for f in self.features]
         self.last_meta: Dict[str, Any] | None = None
+        self._baseline_proba: np.ndarray | None = None
+        self._desc_cat: pd.Series | None = None
+        self._indian_match: np.ndarray | None = None
+        self._seafood_match: np.ndarray | None = None
+        # Filter masks shared by every user with the same (diet, allergies) signature
+        self._mask_for = functools.lru_cache(maxsize=256)(self._compute_mask)
 
         self._load_bundle()
         self._load_food_features()
+        self._index_food_text()
+        self._score_food_table()
         print(f"[XGB] Bundle loaded from {self.model_path}")
-        if self.food_df is not None:
-            print(f"[XGB] Food feature table ready: {len(self.food_df)} rows, {len(self.features)} features")
+        if self._X is not None:
+            print(f"[XGB] Food feature table ready: {len(self._X)} rows, {len(self.features)} features")
 
     def _load_bundle(self) -> None:
         if self.model_path.exists():
@@ -67,165 +156,103 @@ class XGBNutritionRecommender:
         # Attach description and category for display
         meta = food.merge(category, left_on='food_category_id', right_on='id', how='left')
         meta = meta[['fdc_id', 'description', 'category']]
-        self.food_df = pivot_df.merge(meta, on='fdc_id', how='left')
-
-    def _apply_filters(self, df: pd.DataFrame, user: Dict[str, Any]) -> pd.DataFrame:
-        diet = str(user.get('dietType', '')).lower()
-        allergies = [a.strip().lower() for a in str(user.get('allergies', '')).split(',') if a.strip()]
-
-        # Basic text filters using description/category
-        def ok_row(row: pd.Series) -> bool:
-            text = f"{str(row.get('description','')).lower()} {str(row.get('category','')).lower()}"
-            if diet == 'vegetarian':
-                banned = [
-                    # red meat
-                    'beef','pork','mutton','lamb','veal','bacon','ham','pepperoni','salami','sausage','meat',
-                    # poultry
-                    'chicken','turkey','duck','quail',
-                    # seafood and fish
-                    'fish','seafood','prawn','shrimp','crab','lobster','oyster','mussel','clam','squid','octopus',
-                    'anchovy','salmon','tuna','sardine','mackerel','cod','tilapia','trout','snapper','eel',
-                    # eggs and animal derivatives (common vegetarian exclusion)
-                    'egg','eggs','yolk','albumen','gelatin','gelatine','lard'
-                ]
-                if any(b in text for b in banned):
-                    return False
-            elif diet == 'pescatarian':
-                # Exclude red meat and poultry; allow fish/seafood; eggs allowed
-                banned = [
-                    # red meat
-                    'beef','pork','mutton','lamb','veal','bacon','ham','pepperoni','salami','sausage','meat',
-                    'beef product','pork product','beef products','pork products','beef flavor','pork flavor','meat flavor',
-                    # poultry
-                    'chicken','turkey','duck','quail','chicken flavor','poultry'
-                ]
-                if any(b in text for b in banned):
-                    return False
-            elif diet == 'vegan':
-                banned = [
-                    # all meat/seafood
-                    'beef','pork','mutton','lamb','veal','bacon','ham','pepperoni','salami','sausage','meat',
-                    'chicken','turkey','duck','quail',
-                    'fish','seafood','prawn','shrimp','crab','lobster','oyster','mussel','clam','squid','octopus',
-                    'anchovy','salmon','tuna','sardine','mackerel','cod','tilapia','trout','snapper','eel',
-                    # eggs and dairy
-                    'egg','eggs','yolk','albumen',
-                    'milk','curd','paneer','cheese','butter','ghee','yogurt','yoghurt','whey',
-                    # other animal products
-                    'gelatin','gelatine','honey','lard'
-                ]
-                if any(b in text for b in banned):
-                    return False
-            for allergy in allergies:
-                if allergy == 'milk' and any(b in text for b in ['milk','curd','paneer','cheese','butter','ghee','yogurt']):
-                    return False
-                if allergy == 'nuts' and any(b in text for b in ['nut','almond','walnut','peanut','cashew']):
-                    return False
-                if allergy == 'gluten' and any(b in text for b in ['wheat','barley','rye','bread','roti','chapati','paratha']):
-                    return False
-            return True
-
-        mask = df.apply(ok_row, axis=1)
-        return df[mask].copy()
+        self._set_food_table(pivot_df.merge(meta, on='fdc_id', how='left'))
+
+    def _set_food_table(self, food_df: pd.DataFrame) -> None:
+        self._X = food_df[self.features].to_numpy(dtype=np.float32, copy=True)
+        self._meta = food_df[['fdc_id', 'description', 'category']].reset_index(drop=True)
+
+    def _index_food_text(self) -> None:
+        # Lowercase the display text once; filters and boosts only ever read it
+        if self._meta is None:
+            return
+        self._mask_for.cache_clear()
+        desc = self._meta['description'].fillna('').astype(str).str.lower()
+        cat = self._meta['category'].fillna('').astype(str).str.lower()
+        self._desc_cat = desc + ' ' + cat
+        self._indian_match = (desc.str.contains(INDIAN_TERMS) | cat.str.contains(INDIAN_TERMS)).to_numpy()
+        self._seafood_match = (desc.str.contains(SEAFOOD_TERMS) | cat.str.contains(SEAFOOD_TERMS)).to_numpy()
+
+    def _score_food_table(self) -> None:
+        # Model input depends only on the food table, so score every food once up front
+        if self.bundle is None or self._X is None:
+            return
+        Xs = self.bundle['scaler'].transform(self._X)
+        self._baseline_proba = self.bundle['model'].predict_proba(Xs)[:, 1]  # probability of postpartum_supportive
+
+    def _compute_mask(self, diet: str, allergies: Tuple[str, ...]) -> np.ndarray:
+        # Basic text filters using description/category, one regex pass per banned set
+        mask = np.ones(len(self._desc_cat), dtype=bool)
+        banned = DIET_BANNED.get(diet)
+        if banned is not None:
+            mask &= ~self._desc_cat.str.contains(banned).to_numpy()
+        for allergy in allergies:
+            banned = ALLERGY_BANNED.get(allergy)
+            if banned is not None:
+                mask &= ~self._desc_cat.str.contains(banned).to_numpy()
+        # Cached and shared across requests
+        mask.setflags(write=False)
+        return mask
 
     def recommend(self, user: Dict[str, Any], top_k: int = 20) -> List[Dict[str, Any]]:
-        if self.bundle is None or self.food_df is None:
+        if self.bundle is None or self._X is None or self._baseline_proba is None:
             raise RuntimeError("Recommender not initialized")
-        model = self.bundle['model']
-        scaler = self.bundle['scaler']
 
-        df = self.food_df.copy()
-        df = self._apply_filters(df, user)
-        print(f"[XGB] After filters, candidate foods: {len(df)}")
+        u = _normalize_user(user)
+        # Only diets/allergies that actually filter anything go into the cache key
+        diet_key = u['diet'] if u['diet'] in DIET_BANNED else ''
+        allergy_key = tuple(sorted({a for a in u['allergies'] if a in ALLERGY_BANNED}))
+        # Work on candidate positions into the food table; rows are only sliced out for the final top_k
+        cand = np.flatnonzero(self._mask_for(diet_key, allergy_key))
+        print(f"[XGB] After filters, candidate foods: {len(cand)}")
         # initialize meta
         meta: Dict[str, Any] = {
-            'candidates_after_filters': int(len(df))
+            'candidates_after_filters': int(len(cand))
         }
 
-        X = df[self.features].values
-        Xs = scaler.transform(X)
-        proba = model.predict_proba(Xs)[:, 1]  # probability of postpartum_supportive
-        print(f"[XGB] Ran predict_proba on shape {Xs.shape}")
-        df['score'] = proba
+        # All re-ranking multipliers accumulate here and are applied to the baseline once
+        factors = np.ones(len(cand))
 
         # Cuisine-aware boosting
-        cuisine = str(user.get('preferredCuisine', '')).lower()
-        if cuisine == 'indian':
-            indian_terms = [
-                # staples and grains
-                'basmati','rice','millet','ragi','jowar','bajra',
-                # legumes/pulses
-                'lentil','lentils','chickpea','chickpeas','garbanzo','rajma','kidney bean','moong','urad','masoor',
-                # dishes and forms
-                'dal','khichdi','poha','upma','idli','dosa','sambar','rasam','biryani','pulao','paratha','chapati','roti','sabzi','curry',
-                # vegetables often in indian cooking
-                'spinach','palak','saag','cauliflower','gobi','okra','bhindi','eggplant','brinjal','baingan','methi',
-                # spices/herbs (as hints)
-                'turmeric','curry powder','coriander','cumin','fenugreek','mustard seed','cardamom','clove','cinnamon',
-            ]
-            # mark matches
-            def match_indian(text: str) -> bool:
-                t = str(text).lower()
-                return any(term in t for term in indian_terms)
-            df['cuisine_match'] = df['description'].apply(match_indian) | df['category'].apply(match_indian)
-            matched = int(df['cuisine_match'].sum())
+        if u['cuisine'] == 'indian':
+            cuisine_match = self._indian_match[cand]
+            matched = int(cuisine_match.sum())
             print(f"[XGB] Indian cuisine preference: matched {matched} candidates")
             meta['cuisine_matches'] = matched
             # apply multiplicative boost/penalty to re-rank
-            df.loc[df['cuisine_match'], 'score'] *= 1.25
-            df.loc[~df['cuisine_match'], 'score'] *= 0.90
+            factors *= np.where(cuisine_match, 1.25, 0.90)
         else:
             meta['cuisine_matches'] = None
 
         # Diet-aware gentle boosting
-        diet = str(user.get('dietType', '')).lower()
-        if diet == 'pescatarian':
-            seafood_terms = [
-                'fish','seafood','prawn','shrimp','crab','lobster','oyster','mussel','clam','squid','octopus',
-                'anchovy','salmon','tuna','sardine','mackerel','cod','tilapia','trout','snapper','eel'
-            ]
-            def match_seafood(text: str) -> bool:
-                t = str(text).lower()
-                return any(term in t for term in seafood_terms)
-            df['seafood_match'] = df['description'].apply(match_seafood) | df['category'].apply(match_seafood)
-            matched_sf = int(df['seafood_match'].sum())
+        if u['diet'] == 'pescatarian':
+            seafood_match = self._seafood_match[cand]
+            matched_sf = int(seafood_match.sum())
             print(f"[XGB] Pescatarian diet: boosting {matched_sf} seafood candidates")
             meta['seafood_matches'] = matched_sf
-            df.loc[df['seafood_match'], 'score'] *= 1.15
+            factors[seafood_match] *= 1.15
         else:
             meta['seafood_matches'] = None
 
         # Sentiment-aware adjustments (post-hoc reranking):
         # Expect optional fields injected by caller: 'sent_last7_avg', 'sent_var_7d', 'pct_negative_7d'
-        sent_avg = None
-        try:
-            sent_avg = float(user.get('sent_last7_avg')) if user.get('sent_last7_avg') is not None else None
-        except Exception:
-            sent_avg = None
+        sent_avg = u['sent_avg']
         if sent_avg is not None:
             # Compute a nutrient support index per row using critical postpartum nutrients
             critical_feats = ['Energy','Protein','Iron, Fe','Vitamin B-12','Folate, total','Calcium, Ca']
-            # Safe defaults for missing columns
+            X_cand = self._X[cand]
+            support_index = np.zeros(len(cand))
             for cf in critical_feats:
-                if cf not in df.columns:
-                    df[cf] = 0.0
-            def support_index(row):
-                s = 0.0
-                for cf in critical_feats:
-                    target = POSTPARTUM_RDA[cf]['target'] if cf in POSTPARTUM_RDA else 0.0
-                    val = float(row.get(cf, 0.0))
-                    s += (val / target) if target else 0.0
-                return s
-            sup = df.apply(support_index, axis=1)
+                target = POSTPARTUM_RDA[cf]['target']
+                support_index += X_cand[:, self.features.index(cf)] / target
             # Normalize to mean ~0.3-0.6 typical; keep bounded
-            sup = sup.clip(lower=0.0, upper=2.0)
-            df['support_index'] = sup
+            support_index = np.clip(support_index, 0.0, 2.0)
 
             if sent_avg <= -0.05:
                 # More negative mood → boost supportive, nutrient-dense items modestly
                 neg_strength = min(1.0, max(0.0, (-sent_avg) / 1.0))  # 0..1
                 beta = 0.35
-                df['score'] = df['score'] * (1.0 + beta * neg_strength * df['support_index'])
+                factors *= 1.0 + beta * neg_strength * support_index
                 meta['sentiment_adjustment'] = {
                     'mode': 'negative_boost', 'sent_last7_avg': sent_avg, 'beta': beta
                 }
@@ -233,39 +260,46 @@ class XGBNutritionRecommender:
                 # Strong positive → gentle preference for lighter options
                 pos_strength = min(1.0, max(0.0, (sent_avg) / 1.0))
                 gamma = 0.15
-                df['score'] = df['score'] * (1.0 - gamma * pos_strength * (df['support_index'] * 0.5))
+                factors *= 1.0 - gamma * pos_strength * (support_index * 0.5)
                 meta['sentiment_adjustment'] = {
                     'mode': 'positive_lighten', 'sent_last7_avg': sent_avg, 'gamma': gamma
                 }
             else:
                 meta['sentiment_adjustment'] = {'mode': 'neutral', 'sent_last7_avg': sent_avg}
 
-        top = df.sort_values('score', ascending=False).head(top_k)
+        score = self._baseline_proba[cand] * factors
+
+        # Partial selection of the top_k, then order just those
+        if len(score) > top_k:
+            order = np.argpartition(-score, top_k)[:top_k]
+            order = order[np.argsort(-score[order])]
+        else:
+            order = np.argsort(-score)
+        rows = cand[order]
+        top = self._meta.iloc[rows]
+        top_scores = score[order]
         if not top.empty:
-            print(f"[XGB] Top item: {top.iloc[0].get('description','')} | score={float(top.iloc[0]['score']):.4f}")
+            print(f"[XGB] Top item: {top.iloc[0].get('description','')} | score={float(top_scores[0]):.4f}")
 
         # Build detailed nutrient breakdown with %RDA like the notebook
-        recs: List[Dict[str, Any]] = []
-        for _, row in top.iterrows():
-            nutrients = []
-            for feat in self.features:
-                val = float(row.get(feat, 0.0))
-                target = POSTPARTUM_RDA[feat]['target']
-                unit = POSTPARTUM_RDA[feat]['unit']
-                pct = (val / target) * 100 if target else 0.0
-                nutrients.append({
-                    'name': feat,
-                    'amount': round(val, 2),
-                    'unit': unit,
-                    'rda_pct': round(pct, 1)
-                })
-            recs.append({
-                'fdc_id': int(row['fdc_id']),
-                'description': row.get('description', ''),
-                'category': row.get('category', ''),
-                'score': round(float(row['score']), 4),
-                'nutrients': nutrients
-            })
+        top_vals = self._X[rows].astype(float)
+        pct = np.divide(top_vals, self._targets, out=np.zeros_like(top_vals), where=self._targets != 0) * 100
+        recs: List[Dict[str, Any]] = [
+            {
+                'fdc_id': int(fdc_id),
+                'description': desc,
+                'category': cat,
+                'score': round(float(score), 4),
+                'nutrients': [
+                    {'name': f, 'amount': round(v, 2), 'unit': u, 'rda_pct': round(p, 1)}
+                    for f, u, v, p in zip(self.features, self._units, row_v, row_p)
+                ]
+            }
+            for fdc_id, desc, cat, score, row_v, row_p in zip(
+                top['fdc_id'], top['description'], top['category'], top_scores,
+                top_vals.tolist(), pct.tolist()
+            )
+        ]
         # store meta for caller
         self.last_meta = meta
         return recs
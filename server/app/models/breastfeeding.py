@@ -1,40 +1,90 @@
-from datetime import datetime, timedelta
+import copy
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
 from bson import ObjectId
-from ..utils.database import mongo
+from cachetools import TTLCache
+from pymongo import ReturnDocument
+from pymongo.write_concern import WriteConcern
+from ..utils.database import mongo, oid
+
+
+# Index key patterns; ensure_indexes() creates them and the aggregates hint them
+_FEED_INDEX = [('user_id', 1), ('started_at', 1), ('status', 1)]
+_PUMP_INDEX = [('user_id', 1), ('started_at', 1)]
+_DIAPER_INDEX = [('user_id', 1), ('timestamp', 1)]
+_WEIGHT_INDEX = [('user_id', 1), ('recorded_at', 1)]
+
+# Fail fast on pathological ranges instead of spilling to disk or running unbounded
+_AGG_OPTS = {'allowDiskUse': False, 'maxTimeMS': 3000}
+_HISTORY_LIMIT = 10000
+
+# Feed/pump/diaper/weight logs are high-frequency telemetry: a primary ack is enough,
+# no need to wait on replication for every write
+_TELEMETRY_WC = WriteConcern(w=1, j=False)
+
+
+# Dashboard reloads repeat the same insights query; serve them from memory for a short while.
+# user_id -> {(start minute, end minute): insights}; a user's entry is dropped on each of their
+# feed/pump/diaper writes, so new logs show up on the next request
+_INSIGHTS_CACHE = TTLCache(maxsize=10000, ttl=30)
+_INSIGHTS_LOCK = threading.Lock()
+
+
+def _evict_insights(user_id) -> None:
+    with _INSIGHTS_LOCK:
+        _INSIGHTS_CACHE.pop(str(user_id), None)
+
+
+def _telemetry(collection):
+    return collection.with_options(write_concern=_TELEMETRY_WC)
+
+
+def _parse_dt(value) -> Optional[datetime]:
+    """Datetime or ISO-8601 string (trailing 'Z' allowed) -> naive UTC datetime, like utcnow()."""
+    if isinstance(value, datetime):
+        dt = value
+    elif not value:
+        return None
+    else:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
 
 
 class BreastfeedingModel:
     """Data access and business logic for breastfeeding tracking."""
 
+    @staticmethod
+    def ensure_indexes() -> None:
+        """Create the compound indexes backing every per-user range query (idempotent)."""
+        # Also serves get_reminders' latest-feed lookup by walking started_at backwards
+        mongo.db.feeding_sessions.create_index(_FEED_INDEX, background=True)
+        mongo.db.pumping_sessions.create_index(_PUMP_INDEX, background=True)
+        mongo.db.diaper_logs.create_index(_DIAPER_INDEX, background=True)
+        mongo.db.baby_weights.create_index(_WEIGHT_INDEX, background=True)
+
     # ---------------------- Feeding Sessions ----------------------
     @staticmethod
     def start_feed(user_id: str) -> str:
         doc = {
-            'user_id': ObjectId(user_id),
+            'user_id': oid(user_id),
             'started_at': datetime.utcnow(),
             'status': 'ongoing',
             'sides': [],  # list of {side: 'left'|'right', duration_sec: int}
             'type': 'breast',
             'notes': '',
         }
-        res = mongo.db.feeding_sessions.insert_one(doc)
+        res = _telemetry(mongo.db.feeding_sessions).insert_one(doc)
+        _evict_insights(user_id)
         return str(res.inserted_id)
 
     @staticmethod
     def stop_feed(user_id: str, session_id: str, payload: dict) -> dict:
-        session = mongo.db.feeding_sessions.find_one({'_id': ObjectId(session_id), 'user_id': ObjectId(user_id)})
-        if not session:
-            raise ValueError('Session not found')
-
-        ended_at = datetime.utcnow()
-        started_at = session.get('started_at', ended_at)
-        duration = int((ended_at - started_at).total_seconds())
-
-        update = {
-            'ended_at': ended_at,
-            'duration_sec': duration,
-            'status': 'completed',
-            'sides': payload.get('sides', session.get('sides', [])),
+        # Single atomic round trip: the pipeline update reads started_at and stamps the end
+        # server-side, and matching only ongoing sessions stops a double-complete race
+        fields = {
             'type': payload.get('type', 'breast'),
             'bottle_amount_ml': payload.get('bottle_amount_ml'),
             'mood': payload.get('mood'),
@@ -43,76 +93,123 @@ class BreastfeedingModel:
             'sleep_after_min': payload.get('sleep_after_min'),
             'notes': payload.get('notes', ''),
         }
+        update = {
+            'ended_at': '$$NOW',
+            # truncated whole seconds, as int(total_seconds()) gave
+            'duration_sec': {'$toInt': {'$divide': [
+                {'$subtract': ['$$NOW', {'$ifNull': ['$started_at', '$$NOW']}]}, 1000]}},
+            'status': 'completed',
+            'sides': {'$literal': payload['sides']} if 'sides' in payload else {'$ifNull': ['$sides', []]},
+            # $literal keeps client strings such as '$notes' from being read as field paths
+            **{k: {'$literal': v} for k, v in fields.items()},
+        }
+        session = mongo.db.feeding_sessions.find_one_and_update(
+            {'_id': ObjectId(session_id), 'user_id': oid(user_id), 'status': 'ongoing'},
+            [{'$set': update}],
+            projection={'_id': 0, **{k: 1 for k in update}},
+            return_document=ReturnDocument.AFTER,
+        )
+        if not session:
+            raise ValueError('Session not found')
+        _evict_insights(user_id)
 
-        mongo.db.feeding_sessions.update_one({'_id': session['_id']}, {'$set': update})
-        update['session_id'] = session_id
-        return update
+        session['session_id'] = session_id
+        return session
 
     @staticmethod
-    def get_feed_history(user_id: str, start: datetime, end: datetime) -> list:
+    def get_feed_history(user_id: str, start: datetime, end: datetime, fields: Optional[dict] = None) -> list:
+        """Sessions in range, oldest first; `fields` is an optional projection for callers needing a subset."""
         cur = mongo.db.feeding_sessions.find({
-            'user_id': ObjectId(user_id),
+            'user_id': oid(user_id),
             'started_at': {'$gte': start, '$lte': end}
-        }).sort('started_at', 1)
+        }, fields).sort('started_at', 1).limit(_HISTORY_LIMIT)
         return [BreastfeedingModel._serialize(doc) for doc in cur]
 
     @staticmethod
-    def get_feed_summary(user_id: str, start: datetime, end: datetime) -> dict:
-        pipeline = [
+    def _feed_summary_pipeline(user_oid: ObjectId, start: datetime, end: datetime) -> list:
+        # Sessions in range, each carrying the previous session's end for gap computation
+        # ($setWindowFields needs MongoDB 5.0, see MIN_SERVER_VERSION in utils.database)
+        return [
             {'$match': {
-                'user_id': ObjectId(user_id),
-                'started_at': {'$gte': start, '$lte': end},
-                'status': 'completed'
+                'user_id': user_oid,
+                'started_at': {'$gte': start, '$lte': end}
+            }},
+            {'$setWindowFields': {
+                'partitionBy': '$user_id',
+                'sortBy': {'started_at': 1},
+                'output': {
+                    'prev_end': {'$shift': {'output': {'$ifNull': ['$ended_at', '$started_at']}, 'by': -1}}
+                }
             }},
-            {'$group': {
-                '_id': None,
-                'count': {'$sum': 1},
-                'total_duration': {'$sum': {'$ifNull': ['$duration_sec', 0]}},
-                'avg_mood': {'$avg': {'$ifNull': ['$mood', None]}},
-                'avg_pain': {'$avg': {'$ifNull': ['$pain_level', None]}},
-                'avg_sleep_after_min': {'$avg': {'$ifNull': ['$sleep_after_min', None]}}
-            }}
         ]
-        agg = list(mongo.db.feeding_sessions.aggregate(pipeline))
-        summary = agg[0] if agg else {'count': 0, 'total_duration': 0}
-        # avg gap between feeds
-        history = BreastfeedingModel.get_feed_history(user_id, start, end)
-        gaps = []
-        for i in range(1, len(history)):
-            prev_end = history[i-1].get('ended_at') or history[i-1]['started_at']
-            cur_start = history[i]['started_at']
-            gaps.append((cur_start - prev_end).total_seconds())
-        avg_gap = sum(gaps)/len(gaps) if gaps else None
-        # simple cluster-feed window detection (18-21 local fallback using UTC)
-        hours = {}
-        for h in history:
-            hr = h['started_at'].hour
-            hours[hr] = hours.get(hr, 0) + 1
-        cluster_window = max(hours, key=hours.get) if hours else None
+
+    @staticmethod
+    def _feed_summary_facets() -> dict:
+        return {
+            'totals': [
+                {'$match': {'status': 'completed'}},
+                {'$group': {
+                    '_id': None,
+                    'count': {'$sum': 1},
+                    'total_duration': {'$sum': '$duration_sec'},
+                    'avg_mood': {'$avg': '$mood'},
+                    'avg_pain': {'$avg': '$pain_level'},
+                    'avg_sleep_after_min': {'$avg': '$sleep_after_min'}
+                }}
+            ],
+            # avg gap between feeds ($avg skips the first session's null gap)
+            'gaps': [
+                {'$group': {
+                    '_id': None,
+                    'avg_gap_sec': {'$avg': {'$divide': [{'$subtract': ['$started_at', '$prev_end']}, 1000]}}
+                }}
+            ],
+            # simple cluster-feed window detection (18-21 local fallback using UTC);
+            # ties go to the hour seen first
+            'by_hour': [
+                {'$match': {'started_at': {'$type': 'date'}}},
+                {'$group': {'_id': {'$hour': '$started_at'}, 'n': {'$sum': 1}, 'first': {'$min': '$started_at'}}},
+                {'$sort': {'n': -1, 'first': 1}},
+                {'$limit': 1}
+            ]
+        }
+
+    @staticmethod
+    def _feed_summary_projection() -> dict:
+        # Shape the facet arrays into the response document; $ifNull keeps empty facets
+        # as explicit 0/null instead of dropping the field
+        def first(path, default=None):
+            return {'$ifNull': [{'$arrayElemAt': [path, 0]}, default]}
         return {
-            'count': summary.get('count', 0),
-            'total_duration_sec': summary.get('total_duration', 0),
-            'avg_gap_sec': avg_gap,
-            'cluster_hour': cluster_window,
-            'avg_mood': summary.get('avg_mood'),
-            'avg_pain': summary.get('avg_pain'),
-            'avg_sleep_after_min': summary.get('avg_sleep_after_min'),
+            '_id': 0,
+            'count': first('$totals.count', 0),
+            'total_duration_sec': first('$totals.total_duration', 0),
+            'avg_gap_sec': first('$gaps.avg_gap_sec'),
+            'cluster_hour': first('$by_hour._id'),
+            'avg_mood': first('$totals.avg_mood'),
+            'avg_pain': first('$totals.avg_pain'),
+            'avg_sleep_after_min': first('$totals.avg_sleep_after_min'),
         }
 
+    @staticmethod
+    def get_feed_summary(user_id: str, start: datetime, end: datetime) -> dict:
+        # One round trip: totals over completed feeds, plus gap/cluster stats over every session
+        pipeline = BreastfeedingModel._feed_summary_pipeline(oid(user_id), start, end) + [
+            {'$facet': BreastfeedingModel._feed_summary_facets()},
+            {'$project': BreastfeedingModel._feed_summary_projection()}
+        ]
+        return next(mongo.db.feeding_sessions.aggregate(pipeline, hint=_FEED_INDEX, **_AGG_OPTS))
+
     # ---------------------- Pumping ----------------------
     @staticmethod
     def log_pump(user_id: str, payload: dict) -> str:
-        started_at = payload.get('started_at') or datetime.utcnow()
-        ended_at = payload.get('ended_at') or started_at
-        if isinstance(started_at, str):
-            started_at = datetime.fromisoformat(started_at)
-        if isinstance(ended_at, str):
-            ended_at = datetime.fromisoformat(ended_at)
+        started_at = _parse_dt(payload.get('started_at')) or datetime.utcnow()
+        ended_at = _parse_dt(payload.get('ended_at')) or started_at
         duration = int((ended_at - started_at).total_seconds())
         outputs = payload.get('outputs', [])  # [{side, amount_ml}]
-        total_ml = sum([o.get('amount_ml', 0) for o in outputs])
+        total_ml = sum(o.get('amount_ml', 0) or 0 for o in outputs)
         doc = {
-            'user_id': ObjectId(user_id),
+            'user_id': oid(user_id),
             'started_at': started_at,
             'ended_at': ended_at,
             'duration_sec': duration,
@@ -120,80 +217,126 @@ class BreastfeedingModel:
             'total_amount_ml': total_ml,
             'notes': payload.get('notes', '')
         }
-        res = mongo.db.pumping_sessions.insert_one(doc)
+        res = _telemetry(mongo.db.pumping_sessions).insert_one(doc)
+        _evict_insights(user_id)
         return str(res.inserted_id)
 
     @staticmethod
     def get_pump_summary(user_id: str, start: datetime, end: datetime) -> dict:
         pipeline = [
             {'$match': {
-                'user_id': ObjectId(user_id),
+                'user_id': oid(user_id),
                 'started_at': {'$gte': start, '$lte': end}
             }},
             {'$group': {
                 '_id': None,
                 'count': {'$sum': 1},
-                'total_ml': {'$sum': {'$ifNull': ['$total_amount_ml', 0]}},
-                'total_duration': {'$sum': {'$ifNull': ['$duration_sec', 0]}}
+                'total_ml': {'$sum': '$total_amount_ml'},
+                'total_duration': {'$sum': '$duration_sec'}
             }}
         ]
-        agg = list(mongo.db.pumping_sessions.aggregate(pipeline))
+        agg = list(mongo.db.pumping_sessions.aggregate(pipeline, hint=_PUMP_INDEX, **_AGG_OPTS))
         return agg[0] if agg else {'count': 0, 'total_ml': 0, 'total_duration': 0}
 
     # ---------------------- Diapers ----------------------
     @staticmethod
     def log_diaper(user_id: str, payload: dict) -> str:
         doc = {
-            'user_id': ObjectId(user_id),
+            'user_id': oid(user_id),
             'timestamp': datetime.utcnow(),
             'wet_count': int(payload.get('wet_count', 0)),
             'dirty_count': int(payload.get('dirty_count', 0)),
             'notes': payload.get('notes', '')
         }
-        res = mongo.db.diaper_logs.insert_one(doc)
+        res = _telemetry(mongo.db.diaper_logs).insert_one(doc)
+        _evict_insights(user_id)
         return str(res.inserted_id)
 
     @staticmethod
     def get_diaper_summary(user_id: str, start: datetime, end: datetime) -> dict:
         pipeline = [
             {'$match': {
-                'user_id': ObjectId(user_id),
+                'user_id': oid(user_id),
                 'timestamp': {'$gte': start, '$lte': end}
             }},
             {'$group': {
                 '_id': None,
-                'wet_total': {'$sum': {'$ifNull': ['$wet_count', 0]}},
-                'dirty_total': {'$sum': {'$ifNull': ['$dirty_count', 0]}}
+                'wet_total': {'$sum': '$wet_count'},
+                'dirty_total': {'$sum': '$dirty_count'}
             }}
         ]
-        agg = list(mongo.db.diaper_logs.aggregate(pipeline))
+        agg = list(mongo.db.diaper_logs.aggregate(pipeline, hint=_DIAPER_INDEX, **_AGG_OPTS))
         return agg[0] if agg else {'wet_total': 0, 'dirty_total': 0}
 
     # ---------------------- Weight ----------------------
     @staticmethod
     def log_weight(user_id: str, payload: dict) -> str:
         doc = {
-            'user_id': ObjectId(user_id),
-            'recorded_at': datetime.fromisoformat(payload['recorded_at']) if isinstance(payload.get('recorded_at'), str) else (payload.get('recorded_at') or datetime.utcnow()),
+            'user_id': oid(user_id),
+            'recorded_at': _parse_dt(payload.get('recorded_at')) or datetime.utcnow(),
             'weight_kg': float(payload['weight_kg']),
             'notes': payload.get('notes', '')
         }
-        res = mongo.db.baby_weights.insert_one(doc)
+        res = _telemetry(mongo.db.baby_weights).insert_one(doc)
         return str(res.inserted_id)
 
     @staticmethod
-    def get_weight_history(user_id: str, start: datetime, end: datetime) -> list:
+    def get_weight_history(user_id: str, start: datetime, end: datetime, fields: Optional[dict] = None) -> list:
+        """Weights in range, oldest first; `fields` is an optional projection for callers needing a subset."""
         cur = mongo.db.baby_weights.find({
-            'user_id': ObjectId(user_id),
+            'user_id': oid(user_id),
             'recorded_at': {'$gte': start, '$lte': end}
-        }).sort('recorded_at', 1)
+        }, fields).sort('recorded_at', 1).limit(_HISTORY_LIMIT)
         return [BreastfeedingModel._serialize(doc) for doc in cur]
 
     # ---------------------- Insights & Reminders ----------------------
     @staticmethod
     def get_insights(user_id: str, start: datetime, end: datetime) -> dict:
-        feed_sum = BreastfeedingModel.get_feed_summary(user_id, start, end)
-        diaper_sum = BreastfeedingModel.get_diaper_summary(user_id, start, end)
+        user_key = str(user_id)
+        key = (int(start.timestamp()) // 60, int(end.timestamp()) // 60)
+        with _INSIGHTS_LOCK:
+            cached = _INSIGHTS_CACHE.get(user_key, {}).get(key)
+        if cached is None:
+            cached = BreastfeedingModel._build_insights(user_id, start, end)
+            with _INSIGHTS_LOCK:
+                _INSIGHTS_CACHE.setdefault(user_key, {})[key] = cached
+        # Callers get their own copy so they cannot alter what later requests are served
+        return copy.deepcopy(cached)
+
+    @staticmethod
+    def _build_insights(user_id: str, start: datetime, end: datetime) -> dict:
+        user_oid = oid(user_id)
+        # Feed summary and diaper totals in a single aggregate; the diaper totals arrive as
+        # one extra document (no started_at/status) that only the 'diaper' facet picks up
+        pipeline = BreastfeedingModel._feed_summary_pipeline(user_oid, start, end) + [
+            {'$unionWith': {
+                'coll': 'diaper_logs',
+                'pipeline': [
+                    {'$match': {
+                        'user_id': user_oid,
+                        'timestamp': {'$gte': start, '$lte': end}
+                    }},
+                    {'$group': {
+                        '_id': 'diaper_totals',
+                        'wet_total': {'$sum': '$wet_count'},
+                        'dirty_total': {'$sum': '$dirty_count'}
+                    }}
+                ]
+            }},
+            {'$facet': {
+                **BreastfeedingModel._feed_summary_facets(),
+                'diaper': [
+                    {'$match': {'_id': 'diaper_totals'}},
+                    {'$project': {'_id': 0, 'wet_total': 1, 'dirty_total': 1}}
+                ]
+            }},
+            {'$project': {
+                **BreastfeedingModel._feed_summary_projection(),
+                'diaper': {'$ifNull': [{'$arrayElemAt': ['$diaper', 0]}, {'wet_total': 0, 'dirty_total': 0}]}
+            }}
+        ]
+        feed_sum = next(mongo.db.feeding_sessions.aggregate(pipeline, hint=_FEED_INDEX, **_AGG_OPTS))
+        diaper_sum = feed_sum.pop('diaper')
         insights = []
         if feed_sum['count'] < 8 and (end - start) <= timedelta(days=1):
             insights.append('Feeding frequency is below 8 today. Consider offering feeds more frequently.')
@@ -209,10 +352,12 @@ class BreastfeedingModel:
 
     @staticmethod
     def get_reminders(user_id: str) -> dict:
-        last = mongo.db.feeding_sessions.find({'user_id': ObjectId(user_id)}).sort('started_at', -1).limit(1)
-        last_start = None
-        for d in last:
-            last_start = d.get('started_at')
+        doc = mongo.db.feeding_sessions.find_one(
+            {'user_id': oid(user_id)},
+            projection={'_id': 0, 'started_at': 1},
+            sort=[('started_at', -1)]
+        )
+        last_start = doc and doc.get('started_at')
         if not last_start:
             return {'since_last_feed_min': None, 'needs_reminder': False}
         delta_min = int((datetime.utcnow() - last_start).total_seconds() / 60)
@@ -223,6 +368,7 @@ class BreastfeedingModel:
     def _serialize(doc: dict) -> dict:
         if not doc:
             return {}
-        d = dict(doc)
-        d['id'] = str(d.pop('_id'))
-        return d
+        # Cursor documents are fresh dicts, so rename _id in place rather than copying
+        if '_id' in doc:  # absent when a projection excluded it
+            doc['id'] = str(doc.pop('_id'))
+        return doc
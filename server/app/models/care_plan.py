@@ -1,12 +1,395 @@
 from datetime import datetime, timedelta
 from bson import ObjectId
-from ..utils.database import mongo
-import pandas as pd
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+from pymongo.write_concern import WriteConcern
+from ..utils.database import mongo, oid
 import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import LabelEncoder, StandardScaler
-import joblib
+import bisect
+import functools
+import json
+import logging
+import operator
 import os
+import re
+import threading
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# Use numba for the single-row nearest-centroid kernel if available
+try:
+    from numba import njit as _njit  # type: ignore
+except Exception:
+    _njit = None
+
+
+def _nearest_centroid_numpy(features, centers, mean, inv_scale):
+    features_scaled = (features - mean) * inv_scale
+    return ((centers - features_scaled) ** 2).sum(axis=1).argmin()
+
+
+if _njit is not None:
+    @_njit(cache=True, fastmath=True)
+    def _nearest_centroid(features, centers, mean, inv_scale):
+        # Standardize, then argmin of squared distances, without temporaries
+        best, best_d = 0, np.inf
+        for k in range(centers.shape[0]):
+            d = 0.0
+            for j in range(features.shape[0]):
+                diff = centers[k, j] - (features[j] - mean[j]) * inv_scale[j]
+                d += diff * diff
+            if d < best_d:
+                best, best_d = k, d
+        return best
+else:
+    _nearest_centroid = _nearest_centroid_numpy
+
+
+# Generated care plans can always be rebuilt from the profile, so a primary ack is enough
+_REGENERABLE_WC = WriteConcern(w=1, j=False)
+
+# Absolute path to the trained bundle (project root is 3 levels up from server/app/models)
+_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+    'ml', 'models', 'care_plan_kmeans_model.pkl'
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _load_care_plan_artifacts(model_path):
+    """Read the K-means bundle once per process; None when it is missing or unreadable.
+
+    Prefers the pickle-free .npz export written next to the .pkl by the training script.
+    """
+    npz_path = os.path.splitext(model_path)[0] + '.npz'
+    try:
+        if os.path.exists(npz_path):
+            with np.load(npz_path) as data:
+                artifacts = {
+                    'cluster_centers': data['centers'],
+                    'scaler_mean': data['scaler_mean'],
+                    'scaler_scale': data['scaler_scale'],
+                    'label_encoders': {
+                        name[len('classes_'):]: data[name] for name in data.files if name.startswith('classes_')
+                    },
+                    'cluster_profiles': {
+                        int(k): v for k, v in json.loads(str(data['cluster_profiles'])).items()
+                    },
+                }
+        elif os.path.exists(model_path):
+            # Legacy pickle: joblib (and the sklearn classes it unpickles) only load on this path
+            import joblib
+            model_data = joblib.load(model_path)
+            kmeans_model = model_data.get('kmeans_model')
+            scaler = model_data.get('scaler')
+            has_model = kmeans_model is not None and scaler is not None
+            artifacts = {
+                'cluster_centers': kmeans_model.cluster_centers_ if has_model else None,
+                'scaler_mean': scaler.mean_ if has_model else None,
+                'scaler_scale': scaler.scale_ if has_model else None,
+                'label_encoders': model_data.get('label_encoders', {}),
+                'cluster_profiles': model_data.get('cluster_profiles', {}),
+            }
+        else:
+            logger.warning("⚠️ Care Plan model not found, will use fallback logic")
+            return None
+        logger.info("✅ Care Plan K-means model loaded successfully")
+        return artifacts
+    except Exception:
+        logger.exception("Error loading Care Plan model")
+    return None
+
+
+# Fallback cluster rules, highest priority first:
+#   bit 4 -> 0  high-risk PPD, early postpartum
+#   bit 3 -> 1  feeding issues
+#   bit 2 -> 2  late postpartum, low risk
+#   bit 1 -> 3  C-section recovery
+#   bit 0 -> 4  support system issues
+# The highest set bit wins; no flags defaults to 1 (moderate risk)
+_RULE_LUT = tuple(5 - flags.bit_length() if flags else 1 for flags in range(32))
+_CONCERN_RE = re.compile(r'milk|feeding|support')
+
+# Profile fields read by the plan generators, with the defaults they assume when missing
+_PROFILE_DEFAULTS = {
+    'postpartum_week': 4,
+    'epds_score': 10,
+    'delivery_type': 'vaginal',
+    'feeding': 'breastfeeding',
+    'pain_level': 3,
+    'mood_score': 5,
+    'energy_level': 4,
+    'sleep_hours': 5,
+    'support_level': 3,
+}
+_ProfileFields = namedtuple('_ProfileFields', [*_PROFILE_DEFAULTS, 'sent_blended', 'sent_last7_avg'])
+
+# Risk factor and challenge rules as (profile field, comparison, threshold, label), checked in order
+_RISK_RULES = (
+    ('epds_score', operator.ge, 12, 'high_ppd_risk'),
+    ('support_level', operator.le, 2, 'low_support'),
+    ('sleep_hours', operator.lt, 4, 'severe_sleep_deprivation'),
+    ('pain_level', operator.ge, 7, 'high_pain'),
+)
+_CHALLENGE_RULES = (
+    ('mood_score', operator.le, 3, 'mood_regulation'),
+    ('energy_level', operator.le, 3, 'low_energy'),
+    ('pain_level', operator.ge, 6, 'pain_management'),
+)
+
+
+# Profile keys stored on the care plan: everything the generators read, so
+# regenerate_weekly_plan can rebuild from the stored copy; anything else is dropped
+_PERSISTED_PROFILE_KEYS = (
+    'user_id', *_PROFILE_DEFAULTS, 'ppd_risk_percentage', 'specific_concerns', 'sentiment_context',
+    'previous_pregnancies', 'has_complications', 'cultural_preferences',
+)
+
+
+def _profile_fields(user_profile):
+    """Read every generator input from the profile once"""
+    get = user_profile.get
+    sctx = get('sentiment_context', {}) or {}
+    return _ProfileFields(
+        *[get(key, default) for key, default in _PROFILE_DEFAULTS.items()],
+        sctx.get('sent_blended'),
+        sctx.get('sent_last7_avg'),
+    )
+
+
+# Sentiment bands as sorted edges for bisect_left: a value equal to an edge falls in the lower
+# band, so edges whose upper band is closed (s >= x) are nudged to the float just below x
+_SENT_BUDGET_EDGES = (-0.3, 0.0, float(np.nextafter(0.4, -np.inf)))
+_SENT_BUDGETS = (40, 50, 60, 75)
+
+_SENT_ADJUST_EDGES = (-0.3, float(np.nextafter(0.1, -np.inf)), float(np.nextafter(0.4, -np.inf)))
+# Physical recovery task adjustments per band:
+# (min duration, duration factor, floor, cap, new priority for 'medium' tasks)
+_SENT_TASK_ADJUST = (
+    (10, 0.7, 5, float('inf'), 'low'),     # low: lighter, de-prioritized
+    (15, 0.85, 0, float('inf'), None),     # moderately low: slight softening
+    None,                                  # neutral: unchanged
+    (10, 1.2, 0, 25, 'high'),              # positive: gentle progressions
+)
+
+# Weekly priorities in rule order; _PRIORITY_SETS[mask] is the selection for each
+# combination of rule bits (top 3, or the defaults when no rule fires)
+_PRIORITY_MH = {
+    'icon': '🧠',
+    'title': 'Mental Health & Emotional Wellbeing',
+    'description': 'Focus on mood monitoring and stress management techniques'
+}
+_PRIORITY_SELF_CARE = {
+    'icon': '😔',
+    'title': 'Gentle Self-Care Focus',
+    'description': 'Prioritize low-effort self-care and rest this week'
+}
+_PRIORITY_PHYSICAL = {
+    'icon': '💪',
+    'title': 'Physical Recovery & Healing',
+    'description': 'Support your body\'s healing process with targeted activities'
+}
+_PRIORITY_FEEDING = {
+    'icon': '🍼',
+    'title': 'Feeding Success & Nutrition',
+    'description': 'Optimize feeding experience and nutritional intake'
+}
+_DEFAULT_PRIORITIES = (
+    {
+        'icon': '💪',
+        'title': 'Physical Recovery',
+        'description': 'Focus on gentle recovery and healing'
+    },
+    {
+        'icon': '😌',
+        'title': 'Mental Wellbeing',
+        'description': 'Maintain emotional balance and self-care'
+    },
+    {
+        'icon': '🤱',
+        'title': 'Baby Care & Bonding',
+        'description': 'Build confidence in caring for your baby'
+    },
+)
+_PRIORITY_RULES = (_PRIORITY_MH, _PRIORITY_SELF_CARE, _PRIORITY_PHYSICAL, _PRIORITY_FEEDING)
+_PRIORITY_SETS = tuple(
+    tuple(p for bit, p in enumerate(_PRIORITY_RULES) if mask >> bit & 1)[:3] or _DEFAULT_PRIORITIES
+    for mask in range(1 << len(_PRIORITY_RULES))
+)
+
+# Resources: base set plus one group per rule bit (PPD risk, C-section, breastfeeding)
+_BASE_RESOURCES = (
+    {
+        'title': 'Emergency: When to Call Your Doctor - Personalized Warning Signs',
+        'url': 'https://www.acog.org/womens-health/faqs/postpartum-warning-signs',
+        'type': 'emergency'
+    },
+    {
+        'title': 'Guide: Week-by-Week Recovery Expectations',
+        'url': 'https://www.nhs.uk/conditions/baby/support-and-services/your-postnatal-check/',
+        'type': 'guide'
+    },
+)
+_RESOURCE_GROUPS = (
+    (
+        {'title': 'App: Mood tracking and mental health support', 'url': 'https://www.7cups.com/', 'type': 'app'},
+        {'title': 'Hotline: 24/7 Postpartum Support International', 'url': 'https://www.postpartum.net/get-help/help-for-moms/', 'type': 'hotline'},
+        {'title': 'Article: Understanding Your PPD Risk Factors', 'url': 'https://www.who.int/news-room/fact-sheets/detail/depression', 'type': 'article'},
+    ),
+    (
+        {'title': 'Video: C-Section Recovery Exercise Progression', 'url': 'https://www.youtube.com/watch?v=xqR1zQbN0tM', 'type': 'video'},
+        {'title': 'Guide: Scar Care and Healing Timeline', 'url': 'https://www.healthline.com/health/pregnancy/c-section-recovery', 'type': 'guide'},
+    ),
+    (
+        {'title': 'Contact: Local Lactation Consultant Directory', 'url': 'https://www.ilca.org/why-ibclc/falc', 'type': 'contact'},
+        {'title': 'App: Breastfeeding tracker with AI insights', 'url': 'https://www.huckleberrycare.com/', 'type': 'app'},
+    ),
+)
+_RESOURCE_SETS = tuple(
+    _BASE_RESOURCES + sum((g for bit, g in enumerate(_RESOURCE_GROUPS) if mask >> bit & 1), ())
+    for mask in range(1 << len(_RESOURCE_GROUPS))
+)
+
+# Daily task templates; _generate_ml_daily_tasks copies the ones its rules select
+_MH_HIGH_TASKS = (
+    {
+        'title': 'Complete mood check-in questionnaire',
+        'description': 'Track your emotional state to identify patterns',
+        'category': 'mental_health',
+        'priority': 'high',
+        'duration_minutes': 5
+    },
+    {
+        'title': 'Practice guided breathing exercise',
+        'description': 'Use deep breathing to manage anxiety and stress',
+        'category': 'mental_health',
+        'priority': 'high',
+        'duration_minutes': 10
+    },
+)
+_MH_MODERATE_TASKS = (
+    {
+        'title': 'Journal three positive moments from today',
+        'description': 'Focus on gratitude and positive experiences',
+        'category': 'mental_health',
+        'priority': 'medium',
+        'duration_minutes': 10
+    },
+)
+_C_SECTION_EARLY_TASKS = (
+    {
+        'title': 'Monitor incision site for healing',
+        'description': 'Check for redness, swelling, or unusual discharge',
+        'category': 'physical_recovery',
+        'priority': 'high',
+        'duration_minutes': 5
+    },
+    {
+        'title': 'Practice gentle abdominal breathing',
+        'description': 'Support core recovery with breathing exercises',
+        'category': 'physical_recovery',
+        'priority': 'medium',
+        'duration_minutes': 10
+    },
+)
+_WALK_TASKS = (
+    {
+        'title': 'Take a 10-15 minute gentle walk',
+        'description': 'Gradually increase activity as cleared by doctor',
+        'category': 'physical_recovery',
+        'priority': 'medium',
+        'duration_minutes': 15
+    },
+)
+_FEEDING_TASKS = (
+    {
+        'title': 'Log feeding session details',
+        'description': 'Track duration, frequency, and baby satisfaction',
+        'category': 'feeding',
+        'priority': 'high',
+        'duration_minutes': 3
+    },
+    {
+        'title': 'Perform breast care routine',
+        'description': 'Apply nipple cream and check for issues',
+        'category': 'feeding',
+        'priority': 'medium',
+        'duration_minutes': 5
+    },
+)
+_NAP_TASKS = (
+    {
+        'title': 'Plan strategic nap opportunity',
+        'description': 'Identify 20-30 minute nap window when baby sleeps',
+        'category': 'sleep',
+        'priority': 'high',
+        'duration_minutes': 30
+    },
+)
+_STRETCH_TASKS = (
+    {
+        'title': 'Practice energy-boosting stretches',
+        'description': 'Gentle movements to improve circulation and energy',
+        'category': 'wellness',
+        'priority': 'medium',
+        'duration_minutes': 10
+    },
+)
+_ESSENTIAL_TASKS = (
+    {
+        'title': 'Hydration check and water intake',
+        'description': 'Aim for 8-10 glasses, more if breastfeeding',
+        'category': 'wellness',
+        'priority': 'high',
+        'duration_minutes': 2
+    },
+    {
+        'title': 'Take prescribed vitamins/supplements',
+        'description': 'Continue prenatal vitamins as recommended',
+        'category': 'wellness',
+        'priority': 'high',
+        'duration_minutes': 1
+    },
+)
+_SELF_CARE_TASKS = (
+    {
+        'title': '10-minute mindful self-care break',
+        'description': 'Quiet time, breathing, or short compassion meditation',
+        'category': 'mental_health',
+        'priority': 'high',
+        'duration_minutes': 10
+    },
+)
+_WIND_DOWN_TASKS = (
+    {
+        'title': 'Bedtime wind-down routine',
+        'description': 'Dim lights, no screens 30 min before bed, warm shower',
+        'category': 'sleep',
+        'priority': 'high',
+        'duration_minutes': 15
+    },
+)
+
+# Task groups in output order, one rule bit each; essentials (bit 7) are always selected
+_DAILY_TASK_GROUPS = (
+    _MH_HIGH_TASKS, _MH_MODERATE_TASKS, _C_SECTION_EARLY_TASKS, _WALK_TASKS, _FEEDING_TASKS,
+    _NAP_TASKS, _STRETCH_TASKS, _ESSENTIAL_TASKS, _SELF_CARE_TASKS, _WIND_DOWN_TASKS,
+)
+_ESSENTIAL_BIT = 1 << 7
+_DAILY_TASK_SETS = tuple(
+    sum((g for bit, g in enumerate(_DAILY_TASK_GROUPS) if mask >> bit & 1), ())
+    for mask in range(1 << len(_DAILY_TASK_GROUPS))
+)
+
+
+def _fill_progress(care_plan):
+    """Derive progress_tracking.completion_percentage from the stored counters"""
+    progress = care_plan.setdefault('progress_tracking', {})
+    total = progress.setdefault('total_tasks', len(care_plan.get('daily_tasks') or ()))
+    completed = progress.setdefault('completed_tasks', 0)
+    progress['completion_percentage'] = (completed / total * 100) if total > 0 else 0
+
 
 class CarePlan:
     """
@@ -14,32 +397,28 @@ class CarePlan:
     """
     
     def __init__(self):
-        # Get the absolute path to the project root (go up 3 levels from server/app/models)
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_dir)))
-        self.model_path = os.path.join(project_root, 'ml', 'models', 'care_plan_kmeans_model.pkl')
-        self.kmeans_model = None
-        self.scaler = None
+        self.model_path = _MODEL_PATH
+        # Nearest-centroid state: K-means centers plus the StandardScaler mean and 1/scale
+        self.cluster_centers = None
+        self.scaler_mean = None
+        self.scaler_inv_scale = None
         self.label_encoders = {}
         self.cluster_profiles = {}
         self.load_model()
     
     def load_model(self):
         """Load the trained K-means model"""
-        try:
-            if os.path.exists(self.model_path):
-                model_data = joblib.load(self.model_path)
-                self.kmeans_model = model_data.get('kmeans_model')
-                self.scaler = model_data.get('scaler')
-                self.label_encoders = model_data.get('label_encoders', {})
-                self.cluster_profiles = model_data.get('cluster_profiles', {})
-                print("✅ Care Plan K-means model loaded successfully")
-            else:
-                print("⚠️ Care Plan model not found, will use fallback logic")
-                self.initialize_fallback_model()
-        except Exception as e:
-            print(f"Error loading Care Plan model: {e}")
+        model_data = _load_care_plan_artifacts(self.model_path)
+        if model_data is None:
             self.initialize_fallback_model()
+            return
+        if model_data['cluster_centers'] is not None:
+            # float32 is plenty for a 5x7 distance table and keeps it in a couple of cache lines
+            self.cluster_centers = np.asarray(model_data['cluster_centers'], dtype=np.float32)
+            self.scaler_mean = np.asarray(model_data['scaler_mean'], dtype=np.float32)
+            self.scaler_inv_scale = (1.0 / np.asarray(model_data['scaler_scale'], dtype=np.float64)).astype(np.float32)
+        self.label_encoders = model_data['label_encoders']
+        self.cluster_profiles = model_data['cluster_profiles']
     
     def initialize_fallback_model(self):
         """Initialize fallback model with sample data for demonstration"""
@@ -92,6 +471,34 @@ class CarePlan:
             }
         }
     
+    @staticmethod
+    def preload_model():
+        """Load the K-means artifacts at startup so no request pays for it; in a preforking
+        server started with the app preloaded, workers share these pages copy-on-write"""
+        _load_care_plan_artifacts(_MODEL_PATH)
+    
+    @staticmethod
+    def ensure_indexes():
+        """Unique per-user index backing the create_care_plan upsert (idempotent)"""
+        # Partial: provider-authored plans in this collection are keyed by patient_id instead
+        try:
+            mongo.db.care_plans.create_index(
+                'user_id',
+                unique=True,
+                partialFilterExpression={'user_id': {'$exists': True}},
+                background=True
+            )
+        except OperationFailure:
+            # Users left with several plans block the unique build; keep the lookup indexed anyway
+            logger.warning("⚠️ Could not create unique care plan index, falling back to non-unique", exc_info=True)
+            mongo.db.care_plans.create_index(
+                'user_id',
+                partialFilterExpression={'user_id': {'$exists': True}},
+                background=True
+            )
+        # get_care_plan_by_user_id matches on both fields
+        mongo.db.care_plans.create_index([('user_id', 1), ('is_active', 1)], background=True)
+    
     @staticmethod
     def create_care_plan(user_id, user_profile):
         """
@@ -106,17 +513,17 @@ class CarePlan:
             str: Care plan ID if successful, None otherwise
         """
         try:
-            # Remove any existing care plans for this user (for testing)
-            mongo.db.care_plans.delete_many({'user_id': ObjectId(user_id)})
+            care_plan_model = _get_care_plan()
             
-            care_plan_model = CarePlan()
-            
-            # Generate ML-powered care plan
-            ml_care_plan = care_plan_model.generate_ml_care_plan(user_profile)
+            # Generate ML-powered care plan; the sections below are all that gets stored
+            ml_care_plan = care_plan_model.generate_ml_care_plan(user_profile, full=False)
             
+            # Stamp the stored plan with the generator's own timestamp instead of reading the clock again
+            now = ml_care_plan.get('created_at') or datetime.utcnow()
+            user_oid = oid(user_id)
             care_plan_data = {
-                'user_id': ObjectId(user_id),
-                'user_profile': user_profile,
+                'user_id': user_oid,
+                'user_profile': {k: user_profile[k] for k in _PERSISTED_PROFILE_KEYS if k in user_profile},
                 'cluster_id': ml_care_plan.get('cluster_id', 0),
                 'postpartum_week': ml_care_plan.get('postpartum_week', user_profile.get('postpartum_week', 4)),
                 'cluster_info': ml_care_plan.get('cluster_info', {}),
@@ -125,21 +532,36 @@ class CarePlan:
                 'resources': ml_care_plan.get('resources', []),
                 'completed_tasks': ml_care_plan.get('completed_tasks', 0),
                 'completion_percentage': ml_care_plan.get('completion_percentage', 0),
-                'created_at': datetime.utcnow(),
-                'updated_at': datetime.utcnow(),
-                'week_start': datetime.utcnow(),
+                # update_task_completion keeps completed_tasks current with $inc
+                'progress_tracking': {
+                    'total_tasks': len(ml_care_plan.get('daily_tasks', [])),
+                    'completed_tasks': 0
+                },
+                'created_at': now,
+                'updated_at': now,
+                'week_start': now,
                 'is_active': True
             }
             
-            result = mongo.db.care_plans.insert_one(care_plan_data)
-            return str(result.inserted_id)
+            # Replace any existing care plan for this user (for testing) in a single round trip
+            result = mongo.db.care_plans.with_options(write_concern=_REGENERABLE_WC).find_one_and_replace(
+                {'user_id': user_oid},
+                care_plan_data,
+                projection={'_id': 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            return str(result['_id'])
             
-        except Exception as e:
-            print(f"Error creating care plan: {e}")
+        except Exception:
+            logger.exception("Error creating care plan")
             return None
     
-    def generate_ml_care_plan(self, user_profile):
-        """Generate ML-powered care plan using K-means clustering"""
+    def generate_ml_care_plan(self, user_profile, full=True):
+        """Generate ML-powered care plan using K-means clustering
+
+        full=False skips health_monitoring and personalization_context, which are not persisted
+        """
         try:
             # Predict cluster (fallback to rule-based if model not available)
             cluster_id = self.predict_cluster(user_profile)
@@ -148,29 +570,49 @@ class CarePlan:
             cluster_profile = self.cluster_profiles.get(cluster_id, self.cluster_profiles[0])
             
             # Generate personalized care plan
-            care_plan = self.create_personalized_plan(user_profile, cluster_profile, cluster_id)
+            care_plan = self.create_personalized_plan(user_profile, cluster_profile, cluster_id, full)
             
             return care_plan
             
-        except Exception as e:
-            print(f"Error generating ML care plan: {e}")
+        except Exception:
+            logger.exception("Error generating ML care plan")
             return self.generate_fallback_plan(user_profile)
     
     def predict_cluster(self, user_profile):
         """Predict cluster for user profile"""
-        if self.kmeans_model and self.scaler:
+        if self.cluster_centers is not None:
             try:
                 # Prepare features for ML model
-                features = self.prepare_user_features(user_profile)
-                features_scaled = self.scaler.transform([features])
-                cluster_id = self.kmeans_model.predict(features_scaled)[0]
+                # Inlined StandardScaler.transform + KMeans.predict for a single row
+                features = np.asarray(self.prepare_user_features(user_profile), dtype=np.float32)
+                cluster_id = _nearest_centroid(
+                    features, self.cluster_centers, self.scaler_mean, self.scaler_inv_scale
+                )
                 return int(cluster_id)
-            except Exception as e:
-                print(f"Error in ML prediction: {e}")
+            except Exception:
+                logger.exception("Error in ML prediction")
         
         # Fallback rule-based cluster assignment
         return self.rule_based_cluster_assignment(user_profile)
-    
+
+    def predict_clusters_bulk(self, user_profiles):
+        """Predict clusters for many profiles at once (e.g. mass weekly regeneration)
+
+        Returns:
+            np.ndarray: int cluster id per profile, in input order
+        """
+        if self.cluster_centers is not None and user_profiles:
+            try:
+                features = np.array([self.prepare_user_features(p) for p in user_profiles], dtype=np.float32)
+                features_scaled = (features - self.scaler_mean) * self.scaler_inv_scale
+                # (N, 1, F) - (K, F) -> (N, K) squared distances in one vectorized pass
+                distances = ((features_scaled[:, None, :] - self.cluster_centers) ** 2).sum(axis=2)
+                return distances.argmin(axis=1)
+            except Exception:
+                logger.exception("Error in ML bulk prediction")
+
+        return np.array([self.rule_based_cluster_assignment(p) for p in user_profiles], dtype=np.intp)
+
     def rule_based_cluster_assignment(self, user_profile):
         """Rule-based cluster assignment as fallback"""
         # Use PPD risk percentage if available, otherwise use EPDS score
@@ -187,31 +629,17 @@ class CarePlan:
         
         postpartum_week = user_profile.get('postpartum_week', 4)
         delivery_type = user_profile.get('delivery_type', 'vaginal')
-        concerns = user_profile.get('specific_concerns', '').lower()
-        
-        # High-risk PPD, early postpartum
-        if risk_score >= high_risk_threshold and postpartum_week <= 3:
-            return 0
-        
-        # Feeding issues
-        elif 'milk' in concerns or 'feeding' in concerns:
-            return 1
-        
-        # Late postpartum, low risk
-        elif postpartum_week >= 10 and risk_score < moderate_risk_threshold:
-            return 2
-        
-        # C-section recovery
-        elif delivery_type == 'c_section' and postpartum_week <= 6:
-            return 3
-        
-        # Support system issues
-        elif 'support' in concerns or risk_score >= moderate_risk_threshold:
-            return 4
-        
-        # Default to moderate risk
-        else:
-            return 1
+        concerns = set(_CONCERN_RE.findall(user_profile.get('specific_concerns', '').lower()))
+        
+        # Rule flags in priority order, packed high bit first; see _RULE_LUT
+        flags = (
+            (risk_score >= high_risk_threshold and postpartum_week <= 3) << 4
+            | bool(concerns & {'milk', 'feeding'}) << 3
+            | (postpartum_week >= 10 and risk_score < moderate_risk_threshold) << 2
+            | (delivery_type == 'c_section' and postpartum_week <= 6) << 1
+            | ('support' in concerns or risk_score >= moderate_risk_threshold)
+        )
+        return _RULE_LUT[flags]
     
     def prepare_user_features(self, user_profile):
         """Prepare user features for ML model (7 features to match trained model)"""
@@ -236,8 +664,10 @@ class CarePlan:
         ]
         return features
     
-    def generate_care_plan_tasks(self, user_profile, cluster_id):
+    def generate_care_plan_tasks(self, user_profile, cluster_id, full=True):
         """Generate ML-driven personalized care plan tasks"""
+        profile = _profile_fields(user_profile)
+        now = datetime.utcnow()
         care_plan = {
             'user_id': user_profile['user_id'],
             'postpartum_week': user_profile['postpartum_week'],
@@ -247,376 +677,150 @@ class CarePlan:
             'weekly_priorities': [],
             'daily_tasks': [],
             'resources': [],
-            'health_monitoring': self._generate_health_monitoring_plan(user_profile, cluster_id),
-            'personalization_context': self._build_personalization_context(user_profile),
-            'created_at': datetime.utcnow(),
-            'week_start': datetime.utcnow(),
+            'created_at': now,
+            'week_start': now,
             'completed_tasks': 0,
             'completion_percentage': 0
         }
         
         # Generate ML-driven daily tasks based on comprehensive analysis
-        daily_tasks = self._generate_ml_daily_tasks(user_profile, cluster_id)
+        daily_tasks = self._generate_ml_daily_tasks(user_profile, cluster_id, profile)
         care_plan['daily_tasks'] = daily_tasks
         
         # Generate dynamic weekly priorities based on ML predictions
-        weekly_priorities = self._generate_ml_weekly_priorities(user_profile, cluster_id)
+        weekly_priorities = self._generate_ml_weekly_priorities(user_profile, cluster_id, profile)
         care_plan['weekly_priorities'] = weekly_priorities
         
         # Generate personalized resources
-        resources = self._generate_personalized_resources(user_profile, cluster_id)
+        resources = self._generate_personalized_resources(user_profile, cluster_id, profile)
         care_plan['resources'] = resources
         
         # Sentiment-adaptive suggested daily time budget
-        sctx = user_profile.get('sentiment_context', {}) or {}
-        s = sctx.get('sent_blended')
+        s = profile.sent_blended
         if s is None:
             suggested_budget = 60
-        elif s <= -0.3:
-            suggested_budget = 40
-        elif s <= 0.0:
-            suggested_budget = 50
-        elif s >= 0.4:
-            suggested_budget = 75
         else:
-            suggested_budget = 60
+            suggested_budget = _SENT_BUDGETS[bisect.bisect_left(_SENT_BUDGET_EDGES, s)]
         care_plan['daily_time_budget_minutes'] = suggested_budget
         
+        # Not persisted by create_care_plan, which asks for the plan without them
+        if full:
+            care_plan['health_monitoring'] = self._generate_health_monitoring_plan(user_profile, cluster_id, profile)
+            care_plan['personalization_context'] = self._build_personalization_context(user_profile, profile)
+        
         return care_plan
     
-    def _generate_ml_daily_tasks(self, user_profile, cluster_id):
+    def _generate_ml_daily_tasks(self, user_profile, cluster_id, profile=None):
         """Generate ML-driven daily tasks based on user profile and cluster"""
-        tasks = []
+        profile = profile or _profile_fields(user_profile)
         
         # Extract key variables for ML-based task generation
-        postpartum_week = user_profile.get('postpartum_week', 4)
-        epds_score = user_profile.get('epds_score', 10)
-        delivery_type = user_profile.get('delivery_type', 'vaginal')
-        feeding = user_profile.get('feeding', 'breastfeeding')
-        pain_level = user_profile.get('pain_level', 3)
-        mood_score = user_profile.get('mood_score', 5)
-        energy_level = user_profile.get('energy_level', 4)
-        sleep_hours = user_profile.get('sleep_hours', 5)
-        sctx = user_profile.get('sentiment_context', {}) or {}
-        sent_blended = sctx.get('sent_blended')
-        
+        postpartum_week = profile.postpartum_week
+        epds_score = profile.epds_score
+        delivery_type = profile.delivery_type
+        pain_level = profile.pain_level
+        energy_level = profile.energy_level
+        sleep_hours = profile.sleep_hours
+        sent_blended = profile.sent_blended
+        low_sentiment = sent_blended is not None and sent_blended <= -0.3
+        
+        # Evaluate each rule once into a bitmask that indexes the precomputed task selections
+        mask = _ESSENTIAL_BIT  # Essential wellness tasks (always included but personalized)
         # Mental health tasks (ML-driven based on EPDS score and mood)
-        if epds_score >= 12 or mood_score <= 4:
-            if epds_score >= 15:  # High risk
-                tasks.extend([
-                    {
-                        'title': 'Complete mood check-in questionnaire',
-                        'description': 'Track your emotional state to identify patterns',
-                        'category': 'mental_health',
-                        'priority': 'high',
-                        'duration_minutes': 5
-                    },
-                    {
-                        'title': 'Practice guided breathing exercise',
-                        'description': 'Use deep breathing to manage anxiety and stress',
-                        'category': 'mental_health',
-                        'priority': 'high',
-                        'duration_minutes': 10
-                    }
-                ])
-            else:
-                tasks.append({
-                    'title': 'Journal three positive moments from today',
-                    'description': 'Focus on gratitude and positive experiences',
-                    'category': 'mental_health',
-                    'priority': 'medium',
-                    'duration_minutes': 10
-                })
-        
+        if epds_score >= 12 or profile.mood_score <= 4:
+            mask |= 1 << 0 if epds_score >= 15 else 1 << 1  # high risk / moderate
         # Physical recovery tasks (ML-driven based on delivery type and pain level)
         if delivery_type == 'c_section' or pain_level >= 5:
             if delivery_type == 'c_section' and postpartum_week <= 2:
-                tasks.extend([
-                    {
-                        'title': 'Monitor incision site for healing',
-                        'description': 'Check for redness, swelling, or unusual discharge',
-                        'category': 'physical_recovery',
-                        'priority': 'high',
-                        'duration_minutes': 5
-                    },
-                    {
-                        'title': 'Practice gentle abdominal breathing',
-                        'description': 'Support core recovery with breathing exercises',
-                        'category': 'physical_recovery',
-                        'priority': 'medium',
-                        'duration_minutes': 10
-                    }
-                ])
+                mask |= 1 << 2
             elif postpartum_week > 2:
-                tasks.append({
-                    'title': 'Take a 10-15 minute gentle walk',
-                    'description': 'Gradually increase activity as cleared by doctor',
-                    'category': 'physical_recovery',
-                    'priority': 'medium',
-                    'duration_minutes': 15
-                })
-        
+                mask |= 1 << 3
         # Feeding support tasks (ML-driven based on feeding type)
-        if feeding in ['breastfeeding', 'mixed']:
-            tasks.extend([
-                {
-                    'title': 'Log feeding session details',
-                    'description': 'Track duration, frequency, and baby satisfaction',
-                    'category': 'feeding',
-                    'priority': 'high',
-                    'duration_minutes': 3
-                },
-                {
-                    'title': 'Perform breast care routine',
-                    'description': 'Apply nipple cream and check for issues',
-                    'category': 'feeding',
-                    'priority': 'medium',
-                    'duration_minutes': 5
-                }
-            ])
-        
+        if profile.feeding in ('breastfeeding', 'mixed'):
+            mask |= 1 << 4
         # Sleep optimization tasks (ML-driven based on sleep patterns)
-        if sleep_hours < 6 or energy_level <= 4:
-            if sleep_hours < 5:
-                tasks.append({
-                    'title': 'Plan strategic nap opportunity',
-                    'description': 'Identify 20-30 minute nap window when baby sleeps',
-                    'category': 'sleep',
-                    'priority': 'high',
-                    'duration_minutes': 30
-                })
-            
-            if energy_level <= 3:
-                tasks.append({
-                    'title': 'Practice energy-boosting stretches',
-                    'description': 'Gentle movements to improve circulation and energy',
-                    'category': 'wellness',
-                    'priority': 'medium',
-                    'duration_minutes': 10
-                })
-        
-        # Essential wellness tasks (always included but personalized)
-        tasks.extend([
-            {
-                'title': 'Hydration check and water intake',
-                'description': 'Aim for 8-10 glasses, more if breastfeeding',
-                'category': 'wellness',
-                'priority': 'high',
-                'duration_minutes': 2
-            },
-            {
-                'title': 'Take prescribed vitamins/supplements',
-                'description': 'Continue prenatal vitamins as recommended',
-                'category': 'wellness',
-                'priority': 'high',
-                'duration_minutes': 1
-            }
-        ])
+        mask |= (sleep_hours < 5) << 5 | (energy_level <= 3) << 6
+        # Low sentiment: add a gentle self-care task, plus sleep hygiene if sleep is low
+        if low_sentiment:
+            mask |= 1 << 8 | (sleep_hours < 6) << 9
+        templates = _DAILY_TASK_SETS[mask]
 
         # Sentiment-aware adjustments to adapt intensity and prioritization
+        adjust = None
         if sent_blended is not None:
-            # Low sentiment: lighter/self-care focus, boost MH and sleep, reduce strenuous tasks
-            if sent_blended <= -0.3:
-                # Add a gentle self-care task
-                tasks.append({
-                    'title': '10-minute mindful self-care break',
-                    'description': 'Quiet time, breathing, or short compassion meditation',
-                    'category': 'mental_health',
-                    'priority': 'high',
-                    'duration_minutes': 10
-                })
-                # Encourage sleep hygiene if sleep is low
-                if sleep_hours < 6:
-                    tasks.append({
-                        'title': 'Bedtime wind-down routine',
-                        'description': 'Dim lights, no screens 30 min before bed, warm shower',
-                        'category': 'sleep',
-                        'priority': 'high',
-                        'duration_minutes': 15
-                    })
-                # Reduce duration for medium/strenuous physical tasks
-                for t in tasks:
-                    if t.get('category') == 'physical_recovery' and t.get('duration_minutes', 0) >= 10:
-                        t['duration_minutes'] = max(5, int(t['duration_minutes'] * 0.7))
-                        if t.get('priority') == 'medium':
-                            t['priority'] = 'low'
-            # Moderately low sentiment: slight softening
-            elif sent_blended < 0.1:
-                for t in tasks:
-                    if t.get('category') == 'physical_recovery' and t.get('duration_minutes', 0) >= 15:
-                        t['duration_minutes'] = int(t['duration_minutes'] * 0.85)
-            # Positive sentiment: allow gentle progressions
-            elif sent_blended >= 0.4 and energy_level >= 4 and pain_level <= 4:
-                for t in tasks:
-                    if t.get('category') == 'physical_recovery' and t.get('duration_minutes', 0) >= 10:
-                        t['duration_minutes'] = min(25, int(t['duration_minutes'] * 1.2))
-                        if t.get('priority') == 'medium':
-                            t['priority'] = 'high'
-
-        # Add unique IDs and mark as incomplete
-        for i, task in enumerate(tasks):
-            task['id'] = f"{task['category']}_{i+1}"
-            task['completed'] = False
+            band = bisect.bisect_left(_SENT_ADJUST_EDGES, sent_blended)
+            # Progressions only when the body is also ready for them
+            if band < 3 or (energy_level >= 4 and pain_level <= 4):
+                adjust = _SENT_TASK_ADJUST[band]
+        if adjust is not None:
+            min_duration, factor, floor, cap, medium_to = adjust
+        else:
+            min_duration = float('inf')
+
+        # Single pass: copy each selected template with a unique ID, marked incomplete,
+        # and apply the sentiment adjustment to physical recovery tasks
+        tasks = []
+        for i, template in enumerate(templates):
+            t = {**template, 'id': f"{template['category']}_{i+1}", 'completed': False}
+            if t['category'] == 'physical_recovery' and t['duration_minutes'] >= min_duration:
+                t['duration_minutes'] = min(cap, max(floor, int(t['duration_minutes'] * factor)))
+                if medium_to and t['priority'] == 'medium':
+                    t['priority'] = medium_to
+            tasks.append(t)
 
         return tasks
     
-    def _generate_ml_weekly_priorities(self, user_profile, cluster_id):
+    def _generate_ml_weekly_priorities(self, user_profile, cluster_id, profile=None):
         """Generate ML-driven weekly priorities"""
-        priorities = []
-        
-        # Priority 1: Based on highest risk factor
-        epds_score = user_profile.get('epds_score', 10)
-        if epds_score >= 12:
-            priorities.append({
-                'icon': '🧠',
-                'title': 'Mental Health & Emotional Wellbeing',
-                'description': 'Focus on mood monitoring and stress management techniques'
-            })
-        # Elevate MH priority when sentiment is low
-        sctx = user_profile.get('sentiment_context', {}) or {}
-        if sctx.get('sent_blended') is not None and sctx.get('sent_blended') <= -0.3:
-            priorities.append({
-                'icon': '😔',
-                'title': 'Gentle Self-Care Focus',
-                'description': 'Prioritize low-effort self-care and rest this week'
-            })
-        
-        # Priority 2: Based on physical needs
-        delivery_type = user_profile.get('delivery_type', 'vaginal')
-        pain_level = user_profile.get('pain_level', 3)
-        if delivery_type == 'c_section' or pain_level >= 5:
-            priorities.append({
-                'icon': '💪',
-                'title': 'Physical Recovery & Healing',
-                'description': 'Support your body\'s healing process with targeted activities'
-            })
-        
-        # Priority 3: Based on feeding and nutrition
-        feeding = user_profile.get('feeding', 'breastfeeding')
-        if feeding in ['breastfeeding', 'mixed']:
-            priorities.append({
-                'icon': '🍼',
-                'title': 'Feeding Success & Nutrition',
-                'description': 'Optimize feeding experience and nutritional intake'
-            })
-        
-        # Default priorities if none of the above apply
-        if not priorities:
-            priorities = [
-                {
-                    'icon': '💪',
-                    'title': 'Physical Recovery',
-                    'description': 'Focus on gentle recovery and healing'
-                },
-                {
-                    'icon': '😌',
-                    'title': 'Mental Wellbeing',
-                    'description': 'Maintain emotional balance and self-care'
-                },
-                {
-                    'icon': '🤱',
-                    'title': 'Baby Care & Bonding',
-                    'description': 'Build confidence in caring for your baby'
-                }
-            ]
-        
-        return priorities[:3]  # Limit to top 3 priorities
+        profile = profile or _profile_fields(user_profile)
+        mask = (
+            (profile.epds_score >= 12) << 0  # highest risk factor
+            # Elevate MH priority when sentiment is low
+            | (profile.sent_blended is not None and profile.sent_blended <= -0.3) << 1
+            | (profile.delivery_type == 'c_section' or profile.pain_level >= 5) << 2  # physical needs
+            | (profile.feeding in ('breastfeeding', 'mixed')) << 3  # feeding and nutrition
+        )
+        # Copy each entry: the table dicts are shared across every plan built from them
+        return [{**t} for t in _PRIORITY_SETS[mask]]
     
-    def _generate_personalized_resources(self, user_profile, cluster_id):
+    def _generate_personalized_resources(self, user_profile, cluster_id, profile=None):
         """Generate personalized resources based on ML analysis"""
-        resources = []
-        
-        # Helper to create resource objects
-        def R(title, url=None, rtype=None):
-            item = {'title': title}
-            if url:
-                item['url'] = url
-            if rtype:
-                item['type'] = rtype
-            return item
-        
-        # Base resources
-        resources.extend([
-            R(
-                'Emergency: When to Call Your Doctor - Personalized Warning Signs',
-                'https://www.acog.org/womens-health/faqs/postpartum-warning-signs',
-                'emergency'
-            ),
-            R(
-                'Guide: Week-by-Week Recovery Expectations',
-                'https://www.nhs.uk/conditions/baby/support-and-services/your-postnatal-check/',
-                'guide'
-            )
-        ])
-        
-        # Condition-specific resources
-        epds_score = user_profile.get('epds_score', 10)
-        if epds_score >= 12:
-            resources.extend([
-                R('App: Mood tracking and mental health support', 'https://www.7cups.com/', 'app'),
-                R('Hotline: 24/7 Postpartum Support International', 'https://www.postpartum.net/get-help/help-for-moms/', 'hotline'),
-                R('Article: Understanding Your PPD Risk Factors', 'https://www.who.int/news-room/fact-sheets/detail/depression', 'article')
-            ])
-        
-        delivery_type = user_profile.get('delivery_type', 'vaginal')
-        if delivery_type == 'c_section':
-            resources.extend([
-                R('Video: C-Section Recovery Exercise Progression', 'https://www.youtube.com/watch?v=xqR1zQbN0tM', 'video'),
-                R('Guide: Scar Care and Healing Timeline', 'https://www.healthline.com/health/pregnancy/c-section-recovery', 'guide')
-            ])
-        
-        feeding = user_profile.get('feeding', 'breastfeeding')
-        if feeding == 'breastfeeding':
-            resources.extend([
-                R('Contact: Local Lactation Consultant Directory', 'https://www.ilca.org/why-ibclc/falc', 'contact'),
-                R('App: Breastfeeding tracker with AI insights', 'https://www.huckleberrycare.com/', 'app')
-            ])
-        
-        return resources
+        profile = profile or _profile_fields(user_profile)
+        mask = (
+            (profile.epds_score >= 12) << 0
+            | (profile.delivery_type == 'c_section') << 1
+            | (profile.feeding == 'breastfeeding') << 2
+        )
+        # Copy each entry: the table dicts are shared across every plan built from them
+        return [{**t} for t in _RESOURCE_SETS[mask]]
     
-    def _build_personalization_context(self, user_profile):
+    def _build_personalization_context(self, user_profile, profile=None):
         """Build comprehensive personalization context"""
+        profile = profile or _profile_fields(user_profile)
         return {
-            'risk_factors': self._identify_risk_factors(user_profile),
-            'support_level': user_profile.get('support_level', 3),
+            'risk_factors': self._identify_risk_factors(user_profile, profile),
+            'support_level': profile.support_level,
             'cultural_considerations': user_profile.get('cultural_preferences', {}),
             'previous_experience': {
                 'pregnancies': user_profile.get('previous_pregnancies', 0),
                 'complications': user_profile.get('has_complications', False)
             },
-            'current_challenges': self._identify_current_challenges(user_profile)
+            'current_challenges': self._identify_current_challenges(user_profile, profile)
         }
     
-    def _identify_risk_factors(self, user_profile):
+    def _identify_risk_factors(self, user_profile, profile=None):
         """Identify risk factors based on user profile"""
-        risk_factors = []
-        
-        if user_profile.get('epds_score', 10) >= 12:
-            risk_factors.append('high_ppd_risk')
-        if user_profile.get('support_level', 3) <= 2:
-            risk_factors.append('low_support')
-        if user_profile.get('sleep_hours', 5) < 4:
-            risk_factors.append('severe_sleep_deprivation')
-        if user_profile.get('pain_level', 3) >= 7:
-            risk_factors.append('high_pain')
-        
-        return risk_factors
+        profile = profile or _profile_fields(user_profile)
+        return [label for field, cmp, threshold, label in _RISK_RULES if cmp(getattr(profile, field), threshold)]
     
-    def _identify_current_challenges(self, user_profile):
+    def _identify_current_challenges(self, user_profile, profile=None):
         """Identify current challenges for targeted support"""
-        challenges = []
-        
-        if user_profile.get('mood_score', 5) <= 3:
-            challenges.append('mood_regulation')
-        if user_profile.get('energy_level', 4) <= 3:
-            challenges.append('low_energy')
-        if user_profile.get('pain_level', 3) >= 6:
-            challenges.append('pain_management')
-        
-        return challenges
+        profile = profile or _profile_fields(user_profile)
+        return [label for field, cmp, threshold, label in _CHALLENGE_RULES if cmp(getattr(profile, field), threshold)]
     
-    def _generate_health_monitoring_plan(self, user_profile, cluster_id):
+    def _generate_health_monitoring_plan(self, user_profile, cluster_id, profile=None):
         """Generate comprehensive health monitoring plan"""
+        profile = profile or _profile_fields(user_profile)
         monitoring_plan = {
             'daily_metrics': [
                 {'metric': 'mood_score', 'scale': '1-10', 'frequency': 'daily'},
@@ -628,7 +832,7 @@ class CarePlan:
                 {'assessment': 'epds_screening', 'frequency': 'weekly'},
                 {'assessment': 'physical_recovery_check', 'frequency': 'weekly'}
             ],
-            'alerts': self._generate_health_alerts(user_profile),
+            'alerts': self._generate_health_alerts(user_profile, profile),
             'integration_ready': {
                 'wearables': True,
                 'symptom_tracking': True,
@@ -638,26 +842,26 @@ class CarePlan:
         
         return monitoring_plan
     
-    def _generate_health_alerts(self, user_profile):
+    def _generate_health_alerts(self, user_profile, profile=None):
         """Generate health monitoring alerts"""
+        profile = profile or _profile_fields(user_profile)
         alerts = []
         
-        if user_profile.get('epds_score', 10) >= 15:
+        if profile.epds_score >= 15:
             alerts.append({
                 'type': 'high_priority',
                 'condition': 'epds_score >= 15',
                 'message': 'High PPD risk detected - consider immediate professional consultation'
             })
         
-        if user_profile.get('pain_level', 3) >= 8:
+        if profile.pain_level >= 8:
             alerts.append({
                 'type': 'medical_attention',
                 'condition': 'pain_level >= 8',
                 'message': 'Severe pain reported - contact healthcare provider'
             })
         # Persistent low sentiment advisory
-        sctx = user_profile.get('sentiment_context', {}) or {}
-        if sctx.get('sent_last7_avg') is not None and sctx.get('sent_last7_avg') <= -0.3:
+        if profile.sent_last7_avg is not None and profile.sent_last7_avg <= -0.3:
             alerts.append({
                 'type': 'monitoring',
                 'condition': 'low average sentiment last 7 days',
@@ -666,28 +870,30 @@ class CarePlan:
         
         return alerts
     
-    def create_personalized_plan(self, user_profile, cluster_profile, cluster_id):
+    def create_personalized_plan(self, user_profile, cluster_profile, cluster_id, full=True):
         """Create personalized care plan based on cluster analysis"""
-        return self.generate_care_plan_tasks(user_profile, cluster_id)
+        return self.generate_care_plan_tasks(user_profile, cluster_id, full)
     
     def generate_fallback_plan(self, user_profile):
         """Generate comprehensive fallback care plan using ML methods"""
+        profile = _profile_fields(user_profile)
         # Use cluster 0 (default) and generate full plan using ML methods
         cluster_id = 0
+        now = datetime.utcnow()
         
         # Generate comprehensive care plan using the same ML methods
         care_plan = {
             'user_id': user_profile.get('user_id'),
-            'postpartum_week': user_profile.get('postpartum_week', 4),
+            'postpartum_week': profile.postpartum_week,
             'cluster_id': cluster_id,
             'cluster_info': {'name': 'General Recovery', 'description': 'Comprehensive postpartum recovery support'},
-            'weekly_priorities': self._generate_ml_weekly_priorities(user_profile, cluster_id),
-            'daily_tasks': self._generate_ml_daily_tasks(user_profile, cluster_id),
-            'resources': self._generate_personalized_resources(user_profile, cluster_id),
-            'health_monitoring': self._generate_health_monitoring_plan(user_profile, cluster_id),
-            'personalization_context': self._build_personalization_context(user_profile),
-            'created_at': datetime.utcnow(),
-            'week_start': datetime.utcnow(),
+            'weekly_priorities': self._generate_ml_weekly_priorities(user_profile, cluster_id, profile),
+            'daily_tasks': self._generate_ml_daily_tasks(user_profile, cluster_id, profile),
+            'resources': self._generate_personalized_resources(user_profile, cluster_id, profile),
+            'health_monitoring': self._generate_health_monitoring_plan(user_profile, cluster_id, profile),
+            'personalization_context': self._build_personalization_context(user_profile, profile),
+            'created_at': now,
+            'week_start': now,
             'completed_tasks': 0,
             'completion_percentage': 0
         }
@@ -706,58 +912,51 @@ class CarePlan:
     def get_care_plan_by_user_id(user_id):
         """Get active care plan for a user"""
         try:
-            return mongo.db.care_plans.find_one({
-                'user_id': ObjectId(user_id),
+            care_plan = mongo.db.care_plans.find_one({
+                'user_id': oid(user_id),
                 'is_active': True
             })
-        except Exception as e:
-            print(f"Error getting care plan: {e}")
+            if care_plan:
+                _fill_progress(care_plan)
+            return care_plan
+        except Exception:
+            logger.exception("Error getting care plan")
             return None
     
     @staticmethod
     def update_task_completion(care_plan_id, task_id, completed=True):
         """Update task completion status"""
         try:
-            # Update the specific task
+            completed = bool(completed)
+            plan_oid = ObjectId(care_plan_id)
+            # Match only when the task actually flips, so the counter can move by exactly one
+            # without rescanning daily_tasks; completion_percentage is derived from it on read
             result = mongo.db.care_plans.update_one(
                 {
-                    '_id': ObjectId(care_plan_id),
-                    'daily_tasks.id': task_id
+                    '_id': plan_oid,
+                    'daily_tasks': {'$elemMatch': {
+                        'id': task_id,
+                        'completed': {'$ne': True} if completed else True
+                    }}
                 },
                 {
                     '$set': {
                         'daily_tasks.$.completed': completed,
                         'updated_at': datetime.utcnow()
-                    }
+                    },
+                    '$inc': {'progress_tracking.completed_tasks': 1 if completed else -1}
                 }
             )
             
             if result.modified_count > 0:
-                # Recalculate progress
-                care_plan = mongo.db.care_plans.find_one({'_id': ObjectId(care_plan_id)})
-                if care_plan:
-                    total_tasks = len(care_plan['daily_tasks'])
-                    completed_tasks = sum(1 for task in care_plan['daily_tasks'] if task.get('completed', False))
-                    completion_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-                    
-                    # Update progress tracking
-                    mongo.db.care_plans.update_one(
-                        {'_id': ObjectId(care_plan_id)},
-                        {
-                            '$set': {
-                                'progress_tracking.completed_tasks': completed_tasks,
-                                'progress_tracking.completion_percentage': completion_percentage,
-                                'updated_at': datetime.utcnow()
-                            }
-                        }
-                    )
-                
                 return True
+            # Nothing flipped: still a success if the task exists and is already in that state
+            return mongo.db.care_plans.count_documents(
+                {'_id': plan_oid, 'daily_tasks.id': task_id}, limit=1
+            ) > 0
             
-            return False
-            
-        except Exception as e:
-            print(f"Error updating task completion: {e}")
+        except Exception:
+            logger.exception("Error updating task completion")
             return False
     
     @staticmethod
@@ -783,6 +982,20 @@ class CarePlan:
             new_plan_id = CarePlan.create_care_plan(user_id, user_profile)
             return new_plan_id
             
-        except Exception as e:
-            print(f"Error regenerating weekly plan: {e}")
+        except Exception:
+            logger.exception("Error regenerating weekly plan")
             return None
+
+
+_CARE_PLAN_INSTANCE = None
+_CARE_PLAN_LOCK = threading.Lock()
+
+
+def _get_care_plan():
+    """Process-wide CarePlan; it holds only read-only model state, so requests can share it"""
+    global _CARE_PLAN_INSTANCE
+    if _CARE_PLAN_INSTANCE is None:
+        with _CARE_PLAN_LOCK:
+            if _CARE_PLAN_INSTANCE is None:
+                _CARE_PLAN_INSTANCE = CarePlan()
+    return _CARE_PLAN_INSTANCE
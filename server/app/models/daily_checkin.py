@@ -2,6 +2,10 @@ from pymongo import MongoClient
 from bson.objectid import ObjectId
 from datetime import datetime
 import os
+import threading
+
+_collection = None
+_client_lock = threading.Lock()
 
 class DailyCheckin:
     def __init__(self, user_id, mood, journal_entry, timestamp=None):
@@ -25,9 +29,20 @@ class DailyCheckin:
 
     @staticmethod
     def get_collection():
-        client = MongoClient(os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/'))
-        db = client.get_database(os.environ.get('MONGODB_DB_NAME', 'postpartum_care'))
-        return db.daily_checkins
+        # One pooled client per process; MongoClient is thread-safe and meant to be shared
+        global _collection
+        if _collection is None:
+            with _client_lock:
+                if _collection is None:
+                    client = MongoClient(os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/'), maxPoolSize=50)
+                    db = client.get_database(os.environ.get('MONGODB_DB_NAME', 'postpartum_care'))
+                    _collection = db.daily_checkins
+        return _collection
+
+    @staticmethod
+    def ensure_indexes():
+        # get_checkins_for_user walks a user's check-ins newest first
+        DailyCheckin.get_collection().create_index([("user_id", 1), ("timestamp", -1)], background=True)
 
     @staticmethod
     def save_checkin(user_id, mood, journal_entry):
@@ -39,24 +54,49 @@ class DailyCheckin:
         return result
 
     @staticmethod
-    def get_checkins_for_user(user_id, limit=None):
+    def save_checkins_bulk(checkins):
+        """Insert many (user_id, mood, journal_entry) check-ins in one round trip; None if there are none"""
+        docs = [DailyCheckin(user_id, mood, journal_entry).to_dict() for user_id, mood, journal_entry in checkins]
+        if not docs:
+            return None
+        # Unordered: one bad document doesn't stop the rest of the batch
+        return DailyCheckin.get_collection().insert_many(docs, ordered=False)
+
+    @staticmethod
+    def get_checkins_for_user(user_id, limit=None, fields=None):
         collection = DailyCheckin.get_collection()
         # Ensure user_id is correctly handled (string vs ObjectId)
         # Assuming user_id is stored as a string
         query = {"user_id": str(user_id)}
         
-        cursor = collection.find(query).sort("timestamp", -1)
+        pipeline = [{"$match": query}, {"$sort": {"timestamp": -1}}]
         if limit:
-            cursor = cursor.limit(limit)
-            
-        checkins = []
-        for doc in cursor:
-            # Convert ObjectId to string and datetime to ISO format if not already
-            doc['_id'] = str(doc['_id'])
-            if isinstance(doc.get('timestamp'), datetime):
-                 doc['timestamp'] = doc['timestamp'].isoformat()
-            checkins.append(doc)
-            
-        return checkins
+            pipeline.append({"$limit": limit})
+        # fields: optional projection, e.g. ["timestamp", "mood"] to leave journal_entry behind
+        projection = None
+        if fields:
+            projection = fields if isinstance(fields, dict) else dict.fromkeys(fields, 1)
+            pipeline.append({"$project": projection})
+        # Stringify ids and any legacy datetime timestamps in mongod so the
+        # documents come back JSON-ready, without a per-document Python pass.
+        # Timestamps match datetime.isoformat() on a BSON date (what to_dict() stores):
+        # a six-digit fraction, omitted entirely when the milliseconds are zero.
+        stringify = {"timestamp": {"$cond": [
+            {"$eq": [{"$type": "$timestamp"}, "date"]},
+            {"$concat": [
+                {"$dateToString": {"date": "$timestamp", "format": "%Y-%m-%dT%H:%M:%S"}},
+                {"$cond": [
+                    {"$eq": [{"$millisecond": "$timestamp"}, 0]},
+                    "",
+                    {"$concat": [".", {"$dateToString": {"date": "$timestamp", "format": "%L"}}, "000"]}
+                ]}
+            ]},
+            "$timestamp"
+        ]}}
+        # Only when the projection keeps _id; $toString of a missing _id would add it back as null
+        if projection is None or projection.get("_id", 1):
+            stringify["_id"] = {"$toString": "$_id"}
+        pipeline.append({"$set": stringify})
+        return list(collection.aggregate(pipeline))
 
     # You could add more methods here, e.g., to get checkins for a specific date range 
\ No newline at end of file
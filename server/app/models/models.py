@@ -1,6 +1,6 @@
 from datetime import datetime
 from flask_pymongo import PyMongo
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.utils.auth import hash_password, verify_password as check_password
 from bson import ObjectId
 
 mongo = PyMongo()
@@ -8,7 +8,7 @@ mongo = PyMongo()
 class User:
     @staticmethod
     def create_user(email, password, role):
-        hashed_password = generate_password_hash(password)
+        hashed_password = hash_password(password)
         return mongo.db.users.insert_one({
             'email': email,
             'password': hashed_password,
@@ -22,7 +22,7 @@ class User:
     
     @staticmethod
     def verify_password(user, password):
-        return check_password_hash(user['password'], password)
+        return check_password(user['password'], password)
 
 class PatientRecord:
     @staticmethod
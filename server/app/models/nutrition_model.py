@@ -1,18 +1,55 @@
+import functools
 import joblib
 import os
 import numpy as np
-import pandas as pd
 from typing import Dict, Any
 from pathlib import Path
 
+# Try to use onnxruntime if available to run scaler + estimator as one float32 graph
+try:
+    import onnxruntime as _ort  # type: ignore
+    from skl2onnx import to_onnx as _to_onnx  # type: ignore
+    from sklearn.pipeline import make_pipeline as _make_pipeline
+except Exception:
+    _ort = None
+
+# Corrected paths relative to the model file
+# Construct the path relative to the current file (__file__)
+_MODEL_PATH = Path(__file__).parent.parent.parent.parent / 'ml' / 'models' / 'nutrition_model.joblib'
+
+
+@functools.lru_cache(maxsize=1)
+def _load_bundle(model_path=_MODEL_PATH):
+    # Unpickle once per process; every NutritionModel shares the loaded estimator
+    return joblib.load(model_path)
+
+
+@functools.lru_cache(maxsize=1)
+def _compile_bundle(model_path=_MODEL_PATH):
+    """Convert the bundle's scaler + estimator to an ONNX session; None keeps sklearn inference"""
+    bundle = _load_bundle(model_path)
+    if _ort is None or not isinstance(bundle, dict) or not bundle.get('features'):
+        return None
+    estimator = bundle['model']
+    steps = [estimator] if bundle.get('scaler') is None else [bundle['scaler'], estimator]
+    try:
+        onx = _to_onnx(
+            _make_pipeline(*steps),
+            np.zeros((1, len(bundle['features'])), dtype=np.float32),
+            options={id(estimator): {'zipmap': False}}  # plain probability matrix, not a list of dicts
+        )
+        session = _ort.InferenceSession(onx.SerializeToString(), providers=['CPUExecutionProvider'])
+        print("✅ Nutrition model compiled with onnxruntime (float32)")
+        return session
+    except Exception as e:
+        print(f"⚠️ Could not compile nutrition model, using sklearn inference: {e}")
+        return None
+
+
 class NutritionModel:
     def __init__(self):
-        # Corrected paths relative to the model file
-        # Construct the path relative to the current file (__file__)
-        model_path = Path(__file__).parent.parent.parent.parent / 'ml' / 'models' / 'nutrition_model.joblib'
-        
         try:
-            bundle = joblib.load(model_path)
+            bundle = _load_bundle()
             # Support both bundle dicts and legacy direct estimators
             if isinstance(bundle, dict) and {'model', 'scaler', 'features'}.issubset(bundle.keys()):
                 self.model = bundle  # store the entire bundle for downstream methods
@@ -23,10 +60,14 @@ class NutritionModel:
                     'scaler': None,
                     'features': []
                 }
+            # Column position of each expected feature, for assembling single-row inputs
+            self._feat_index = {name: i for i, name in enumerate(self.model['features'])}
+            self.compiled_model = _compile_bundle() if self.model['features'] else None
             print("✅ Nutrition model loaded successfully")
         except FileNotFoundError as e:
             print(f"❌ Error loading nutrition model: {e}")
             self.model = None
+            self.compiled_model = None
 
     def predict(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Make nutrition prediction based on input data"""
@@ -36,12 +77,19 @@ class NutritionModel:
         try:
             # Convert input data to the format expected by the model
             # This will need to be adjusted based on your model's requirements
-            features = self._prepare_features(input_data)
-            
-            # Make prediction
-            estimator = self.model['model'] if isinstance(self.model, dict) and 'model' in self.model else self.model
-            prediction_idx = estimator.predict(features)
-            probabilities = estimator.predict_proba(features) if hasattr(estimator, 'predict_proba') else None
+            if self.compiled_model is not None:
+                # The ONNX graph scales internally; feed it the raw float32 row
+                session = self.compiled_model
+                prediction_idx, probabilities = session.run(
+                    None, {session.get_inputs()[0].name: self._feature_row(input_data, np.float32)}
+                )
+            else:
+                features = self._prepare_features(input_data)
+                
+                # Make prediction
+                estimator = self.model['model'] if isinstance(self.model, dict) and 'model' in self.model else self.model
+                prediction_idx = estimator.predict(features)
+                probabilities = estimator.predict_proba(features) if hasattr(estimator, 'predict_proba') else None
 
             # Decode label if we have a label encoder
             if isinstance(self.model, dict) and 'label_encoder' in self.model and self.model['label_encoder'] is not None:
@@ -52,7 +100,7 @@ class NutritionModel:
             
             return {
                 'prediction': prediction_label,
-                'confidence': round(max(probabilities[0]) * 100, 2) if probabilities is not None else None
+                'confidence': round(float(max(probabilities[0])) * 100, 2) if probabilities is not None else None
             }
             
         except Exception as e:
@@ -64,25 +112,19 @@ class NutritionModel:
         if self.model is None or not isinstance(self.model, dict) or 'features' not in self.model or 'scaler' not in self.model:
             raise ValueError("Model bundle not fully loaded.")
 
-        expected_features = self.model['features']
         scaler = self.model['scaler']
-
-        # Create a DataFrame from input data
-        # Ensure columns match expected features and fill missing with 0
-        input_df = pd.DataFrame([input_data]) # Convert dict to DataFrame row
-
-        # Add any missing expected features with a default value (0)
-        for feature in expected_features:
-            if feature not in input_df.columns:
-                input_df[feature] = 0
-
-        # Ensure the order of columns matches the training features
-        input_df = input_df[expected_features]
+        features = self._feature_row(input_data)
 
         # Scale the input features
         if scaler is not None:
-            scaled_features = scaler.transform(input_df)
-        else:
-            scaled_features = input_df.values
+            return scaler.transform(features)
+        return features
 
-        return scaled_features
\ No newline at end of file
+    def _feature_row(self, input_data: Dict[str, Any], dtype=np.float64) -> np.ndarray:
+        """Fill a single unscaled row in training column order; missing features stay 0"""
+        row = np.zeros((1, len(self._feat_index)), dtype=dtype)
+        for name, value in input_data.items():
+            i = self._feat_index.get(name)
+            if i is not None:
+                row[0, i] = np.nan if value is None else value
+        return row
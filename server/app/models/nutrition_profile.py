@@ -1,6 +1,9 @@
 from datetime import datetime, timedelta
-from bson import ObjectId
 from app import mongo
+from app.utils.database import oid
+
+# Most recent entries kept per progress_tracking category; older ones are trimmed on push
+_PROGRESS_RETENTION = 365
 
 class NutritionProfile:
     def __init__(self, user_id):
@@ -9,7 +12,7 @@ class NutritionProfile:
 
     def create_profile(self, profile_data):
         profile = {
-            'user_id': ObjectId(self.user_id),
+            'user_id': oid(self.user_id),
             'breastfeeding': profile_data.get('breastfeeding'),
             'diet_type': profile_data.get('dietType'),
             'allergies': profile_data.get('allergies', '').split(','),
@@ -29,7 +32,7 @@ class NutritionProfile:
         return self.collection.insert_one(profile)
 
     def get_profile(self):
-        return self.collection.find_one({'user_id': ObjectId(self.user_id)})
+        return self.collection.find_one({'user_id': oid(self.user_id)})
 
     def update_profile(self, profile_data):
         update_data = {
@@ -41,7 +44,7 @@ class NutritionProfile:
             'updated_at': datetime.utcnow()
         }
         return self.collection.update_one(
-            {'user_id': ObjectId(self.user_id)},
+            {'user_id': oid(self.user_id)},
             {'$set': update_data}
         )
 
@@ -49,14 +52,14 @@ class NutritionProfile:
         goal['created_at'] = datetime.utcnow()
         goal['completed'] = False
         return self.collection.update_one(
-            {'user_id': ObjectId(self.user_id)},
+            {'user_id': oid(self.user_id)},
             {'$push': {'nutrition_goals': goal}}
         )
 
     def add_meal_plan(self, meal_plan):
         meal_plan['created_at'] = datetime.utcnow()
         return self.collection.update_one(
-            {'user_id': ObjectId(self.user_id)},
+            {'user_id': oid(self.user_id)},
             {'$push': {'meal_plans': meal_plan}}
         )
 
@@ -66,15 +69,23 @@ class NutritionProfile:
             'value': value
         }
         return self.collection.update_one(
-            {'user_id': ObjectId(self.user_id)},
-            {'$push': {f'progress_tracking.{category}': tracking_entry}}
+            {'user_id': oid(self.user_id)},
+            {'$push': {f'progress_tracking.{category}': {
+                '$each': [tracking_entry],
+                '$slice': -_PROGRESS_RETENTION
+            }}}
         )
 
     def get_progress_history(self, category, days=30):
-        profile = self.get_profile()
-        if not profile or 'progress_tracking' not in profile:
-            return []
-        
-        tracking_data = profile['progress_tracking'].get(category, [])
         cutoff_date = datetime.utcnow() - timedelta(days=days)
-        return [entry for entry in tracking_data if entry['date'] >= cutoff_date] 
\ No newline at end of file
+        # Window the entries in mongod so only the requested days cross the wire
+        result = list(self.collection.aggregate([
+            {'$match': {'user_id': oid(self.user_id)}},
+            {'$limit': 1},
+            {'$project': {'_id': 0, 'entries': {'$filter': {
+                'input': {'$ifNull': [f'$progress_tracking.{category}', []]},
+                'as': 'e',
+                'cond': {'$gte': ['$$e.date', cutoff_date]}
+            }}}}
+        ]))
+        return result[0]['entries'] if result else []
@@ -1,20 +1,37 @@
 from datetime import datetime
-from bson import ObjectId
-from flask_pymongo import PyMongo
-
-mongo = PyMongo()
+from ..utils.database import mongo, oid
 
 class PatientRecord:
     @staticmethod
-    def create_record(user_id, data):
-        return mongo.db.patient_records.insert_one({
-            'user_id': ObjectId(user_id),
+    def ensure_indexes():
+        mongo.db.patient_records.create_index([('user_id', 1), ('created_at', -1)], background=True)
+
+    @staticmethod
+    def _record_doc(user_id, data, created_at):
+        return {
+            'user_id': oid(user_id),
             'blood_pressure': data.get('blood_pressure'),
             'mood': data.get('mood'),
             'notes': data.get('notes'),
-            'created_at': datetime.utcnow()
-        })
+            'created_at': created_at
+        }
+
+    @staticmethod
+    def create_record(user_id, data):
+        return mongo.db.patient_records.insert_one(PatientRecord._record_doc(user_id, data, datetime.utcnow()))
+
+    @staticmethod
+    def create_records_bulk(records):
+        """Insert many (user_id, data) records in one round trip; None if there are none"""
+        now = datetime.utcnow()
+        docs = [PatientRecord._record_doc(user_id, data, now) for user_id, data in records]
+        if not docs:
+            return None
+        # Unordered: one bad document doesn't stop the rest of the batch
+        return mongo.db.patient_records.insert_many(docs, ordered=False)
     
     @staticmethod
-    def get_records(user_id):
-        return list(mongo.db.patient_records.find({'user_id': ObjectId(user_id)}))
\ No newline at end of file
+    def get_records(user_id, fields=None):
+        # fields: optional projection so callers can skip columns they don't render.
+        # Returns the cursor so callers can stream it rather than holding every record
+        return mongo.db.patient_records.find({'user_id': oid(user_id)}, fields).batch_size(100)
\ No newline at end of file
@@ -1,7 +1,52 @@
 from datetime import datetime
+import numpy as np
 from app.utils.database import mongo
 
+# Use numba for the batch risk -> EPDS conversion if available
+try:
+    from numba import njit as _njit, prange as _prange  # type: ignore
+except Exception:
+    _njit = _prange = None
+
+
+def _risk_to_epds_numpy(risk):
+    # Same bands as convert_risk_to_epds_score; astype truncates toward zero like int()
+    return np.where(
+        risk <= 0.3, risk * 30,
+        np.where(risk <= 0.6, 9 + (risk - 0.3) * 40, 21 + (risk - 0.6) * 22.5)
+    ).astype(np.int32)
+
+
+if _njit is not None:
+    # Cohort-sized recomputes: split the rows across cores, writing into a caller-owned buffer.
+    # Compiled lazily on the first bulk call, so worker start-up pays no JIT cost.
+    @_njit(parallel=True, cache=True)
+    def _risk_to_epds_into(risks, out):
+        for i in _prange(risks.shape[0]):
+            r = risks[i]
+            if r <= 0.3:
+                out[i] = int(r * 30)
+            elif r <= 0.6:
+                out[i] = int(9 + (r - 0.3) * 40)
+            else:
+                out[i] = int(21 + (r - 0.6) * 22.5)
+else:
+    def _risk_to_epds_into(risks, out):
+        out[:] = _risk_to_epds_numpy(risks)
+
+
+def _check_risks(risks):
+    # A NaN has no EPDS band: the scalar path's int() raises on it, and the array paths
+    # would otherwise cast it to an arbitrary backend-dependent bucket
+    if np.isnan(risks).any():
+        raise ValueError("risk scores must not be NaN")
+
 class PPDAssessment:
+    @staticmethod
+    def ensure_indexes():
+        """Index backing get_latest_assessment's newest-first lookup (idempotent)"""
+        mongo.db.ppd_assessments.create_index([('user_id', 1), ('date', -1)], background=True)
+
     @staticmethod
     def save_assessment(user_id, responses, risk_score):
         return mongo.db.ppd_assessments.insert_one({
@@ -21,7 +66,14 @@ class PPDAssessment:
     
     @staticmethod
     def convert_risk_to_epds_score(risk_percentage):
-        """Convert PPD risk percentage (0-1) to approximate EPDS score (0-30)"""
+        """Convert PPD risk percentage (0-1) to approximate EPDS score (0-30)
+
+        Also accepts an array of risks (e.g. when backfilling many assessments)
+        and converts them in one compiled pass, returning an int32 array.
+        """
+        if np.ndim(risk_percentage):
+            risks = np.asarray(risk_percentage, dtype=np.float64)
+            return PPDAssessment.convert_risks_bulk(risks.ravel()).reshape(risks.shape)
         # Risk percentage is typically 0-1, convert to EPDS-like score
         # Higher risk = higher EPDS score
         if risk_percentage <= 0.3:  # Low risk
@@ -30,3 +82,17 @@ class PPDAssessment:
             return int(9 + (risk_percentage - 0.3) * 40)  # 9-21
         else:  # High risk
             return int(21 + (risk_percentage - 0.6) * 22.5)  # 21-30
+
+    @staticmethod
+    def convert_risks_bulk(risks, out=None):
+        """Convert a large array of risks to EPDS scores across all cores
+
+        Pass a preallocated int32 ``out`` to reuse it between recomputes.
+        Raises ValueError on NaN risks, as the scalar conversion does.
+        """
+        risks = np.ascontiguousarray(risks, dtype=np.float64)
+        _check_risks(risks)
+        if out is None:
+            out = np.empty(risks.shape[0], dtype=np.int32)
+        _risk_to_epds_into(risks, out)
+        return out
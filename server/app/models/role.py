@@ -1,7 +1,26 @@
+import logging
+import threading
 from datetime import datetime
 from bson import ObjectId
+from cachetools import TTLCache
+from pymongo import UpdateOne
 from ..utils.database import mongo
 
+logger = logging.getLogger(__name__)
+
+# role_key -> (role doc or None, frozenset of its permissions); cleared on every role write
+_ROLE_CACHE = TTLCache(maxsize=64, ttl=60)
+_ROLE_LOCK = threading.Lock()
+
+
+def _invalidate_role_cache():
+    # Imported here: utils.permissions imports this module
+    from ..utils.permissions import clear_denied_permissions
+    with _ROLE_LOCK:
+        _ROLE_CACHE.clear()
+    clear_denied_permissions()
+
+
 class Role:
     """Role management for RBAC system"""
     
@@ -79,44 +98,67 @@ class Role:
         }
     }
 
+    # Built-in roles are immutable at runtime and re-synced from DEFAULT_ROLES on startup,
+    # so their permission checks never need Mongo or the role cache
+    _DEFAULT_PERMISSION_SETS = {key: frozenset(role['permissions']) for key, role in DEFAULT_ROLES.items()}
+
+    @staticmethod
+    def ensure_indexes():
+        """Index backing get_role_by_key (idempotent)"""
+        mongo.db.roles.create_index([('key', 1), ('is_active', 1)], background=True)
+
     @staticmethod
     def initialize_default_roles():
         """Initialize default roles in the database"""
         try:
-            for role_key, role_data in Role.DEFAULT_ROLES.items():
-                existing_role = mongo.db.roles.find_one({'key': role_key})
-                if not existing_role:
-                    role_doc = {
-                        'key': role_key,
-                        'name': role_data['name'],
-                        'description': role_data['description'],
-                        'permissions': role_data['permissions'],
-                        'dashboard_type': role_data['dashboard_type'],
-                        'is_default': role_data['is_default'],
-                        'is_active': True,
-                        'created_at': datetime.utcnow(),
-                        'updated_at': datetime.utcnow()
-                    }
-                    mongo.db.roles.insert_one(role_doc)
-                    print(f"✅ Created default role: {role_data['name']}")
-                else:
-                    # Update permissions for existing default roles
-                    mongo.db.roles.update_one(
-                        {'key': role_key},
-                        {'$set': {
+            now = datetime.utcnow()
+            # Upsert every default role in one round trip; only permissions are re-synced on existing roles
+            ops = [
+                UpdateOne(
+                    {'key': role_key},
+                    {
+                        '$set': {
                             'permissions': role_data['permissions'],
-                            'updated_at': datetime.utcnow()
-                        }}
-                    )
+                            'updated_at': now
+                        },
+                        '$setOnInsert': {
+                            'name': role_data['name'],
+                            'description': role_data['description'],
+                            'dashboard_type': role_data['dashboard_type'],
+                            'is_default': role_data['is_default'],
+                            'is_active': True,
+                            'created_at': now
+                        }
+                    },
+                    upsert=True
+                )
+                for role_key, role_data in Role.DEFAULT_ROLES.items()
+            ]
+            result = mongo.db.roles.bulk_write(ops, ordered=False)
+            if result.upserted_count:
+                logger.info("✅ Created %d default role(s)", result.upserted_count)
+            _invalidate_role_cache()
             return True
-        except Exception as e:
-            print(f"❌ Error initializing default roles: {e}")
+        except Exception:
+            logger.exception("Error initializing default roles")
             return False
 
+    @staticmethod
+    def _cached_role(role_key):
+        """Return (role, permission frozenset), reading Mongo at most once per TTL"""
+        with _ROLE_LOCK:
+            entry = _ROLE_CACHE.get(role_key)
+        if entry is None:
+            role = mongo.db.roles.find_one({'key': role_key, 'is_active': True})
+            entry = (role, frozenset(role.get('permissions', ())) if role else frozenset())
+            with _ROLE_LOCK:
+                _ROLE_CACHE[role_key] = entry
+        return entry
+
     @staticmethod
     def get_role_by_key(role_key):
         """Get role by key"""
-        return mongo.db.roles.find_one({'key': role_key, 'is_active': True})
+        return Role._cached_role(role_key)[0]
 
     @staticmethod
     def get_all_roles():
@@ -127,6 +169,7 @@ class Role:
     def create_custom_role(role_data):
         """Create a custom role"""
         try:
+            now = datetime.utcnow()
             role_doc = {
                 'key': role_data['key'],
                 'name': role_data['name'],
@@ -135,13 +178,14 @@ class Role:
                 'dashboard_type': role_data.get('dashboard_type', 'custom'),
                 'is_default': False,
                 'is_active': True,
-                'created_at': datetime.utcnow(),
-                'updated_at': datetime.utcnow()
+                'created_at': now,
+                'updated_at': now
             }
             result = mongo.db.roles.insert_one(role_doc)
+            _invalidate_role_cache()
             return str(result.inserted_id)
-        except Exception as e:
-            print(f"Error creating custom role: {e}")
+        except Exception:
+            logger.exception("Error creating custom role")
             return None
 
     @staticmethod
@@ -153,9 +197,10 @@ class Role:
                 {'_id': ObjectId(role_id), 'is_default': False},
                 {'$set': update_data}
             )
+            _invalidate_role_cache()
             return result.modified_count > 0
-        except Exception as e:
-            print(f"Error updating role: {e}")
+        except Exception:
+            logger.exception("Error updating role")
             return False
 
     @staticmethod
@@ -166,9 +211,10 @@ class Role:
                 {'_id': ObjectId(role_id), 'is_default': False},
                 {'$set': {'is_active': False, 'updated_at': datetime.utcnow()}}
             )
+            _invalidate_role_cache()
             return result.modified_count > 0
-        except Exception as e:
-            print(f"Error deleting role: {e}")
+        except Exception:
+            logger.exception("Error deleting role")
             return False
 
     @staticmethod
@@ -182,7 +228,9 @@ class Role:
     @staticmethod
     def has_permission(user_role, permission):
         """Check if a role has a specific permission"""
-        permissions = Role.get_user_permissions(user_role)
+        permissions = Role._DEFAULT_PERMISSION_SETS.get(user_role)
+        if permissions is None:
+            permissions = Role._cached_role(user_role)[1]
         return permission in permissions
 
     @staticmethod
@@ -2,7 +2,14 @@ from datetime import datetime
 from app.utils.database import mongo
 from bson import ObjectId
 
+_HISTORY_INDEX = [('user_id', 1), ('symptom_name', 1), ('timestamp', -1)]
+
 class SymptomTracking:
+    @staticmethod
+    def ensure_indexes():
+        """Serves the newest-first history query and the per-user distinct (idempotent)"""
+        mongo.db.symptom_tracking.create_index(_HISTORY_INDEX, background=True)
+
     @staticmethod
     def save_symptom_entry(user_id, symptom_name, value):
         """Saves a symptom tracking entry for a user."""
@@ -13,30 +20,45 @@ class SymptomTracking:
             'timestamp': datetime.utcnow()
         })
 
+    # Number of history entries returned when the caller gives no limit
+    DEFAULT_HISTORY_LIMIT = 1000
+
     @staticmethod
     def get_symptom_history(user_id, symptom_name, limit=None):
-        """Retrieves historical symptom entries for a user and symptom."""
+        """Retrieves historical symptom entries for a user and symptom, newest first.
+
+        At most `limit` entries (DEFAULT_HISTORY_LIMIT when not given) are returned.
+        Returns (entries, truncated), where truncated is True if older entries were left out.
+        """
+        limit = limit or SymptomTracking.DEFAULT_HISTORY_LIMIT
         query = {
             'user_id': ObjectId(user_id),
             'symptom_name': symptom_name
         }
-        # Sort by timestamp descending (most recent first)
-        cursor = mongo.db.symptom_tracking.find(query).sort('timestamp', -1)
-        
-        if limit is not None:
-            cursor = cursor.limit(limit)
-            
-        # Return list of entries, converting ObjectId to string
-        return [{
+        # Only the fields the response uses
+        projection = {'symptom_name': 1, 'value': 1, 'timestamp': 1, '_id': 0}
+        # Sort by timestamp descending (most recent first); one extra entry tells us whether
+        # the history was cut off
+        history = list(mongo.db.symptom_tracking.find(query, projection)
+                       .sort('timestamp', -1)
+                       .limit(limit + 1))
+
+        entries = [{
             'symptom_name': entry['symptom_name'],
             'value': entry['value'],
             'timestamp': entry['timestamp'].isoformat() # Convert datetime to string
-        } for entry in cursor]
+        } for entry in history[:limit]]
+        return entries, len(history) > limit
 
     @staticmethod
     def get_all_symptom_names_for_user(user_id):
         """Retrieves all unique symptom names tracked by a user."""
-        query = {'user_id': ObjectId(user_id)}
-        # Use distinct to get unique symptom names
-        distinct_symptoms = mongo.db.symptom_tracking.distinct('symptom_name', query)
-        return distinct_symptoms 
\ No newline at end of file
+        # Sorting on the index prefix lets the planner answer the $group with a DISTINCT_SCAN
+        # over the history index (pinned by hint) instead of fetching every entry
+        pipeline = [
+            {'$match': {'user_id': ObjectId(user_id)}},
+            {'$sort': {'user_id': 1, 'symptom_name': 1}},
+            {'$group': {'_id': '$symptom_name'}}
+        ]
+        cursor = mongo.db.symptom_tracking.aggregate(pipeline, hint=_HISTORY_INDEX)
+        return sorted(entry['_id'] for entry in cursor) 
\ No newline at end of file
@@ -1,17 +1,44 @@
-﻿from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+﻿import logging
+from datetime import datetime
 from bson import ObjectId
+from pymongo.errors import OperationFailure
 from flask import current_app
-from ..utils.database import mongo
+from ..utils.auth import hash_password, verify_password as check_password
+from ..utils.database import mongo, oid
+
+logger = logging.getLogger(__name__)
+
+# Listing queries never need the password hash; leave it on the server
+_NO_PASSWORD = {'password': 0}
 
 class User:
+    @staticmethod
+    def ensure_indexes():
+        """Indexes for email login lookups and role listings (idempotent)"""
+        try:
+            mongo.db.users.create_index('email', unique=True, background=True)
+        except OperationFailure as e:
+            # Existing duplicate emails block the unique build; keep the lookup indexed anyway
+            logger.warning("⚠️ Could not create unique email index, falling back to non-unique: %s", e)
+            mongo.db.users.create_index('email', background=True)
+        mongo.db.users.create_index([('role', 1), ('is_active', 1)], background=True)
+        # Admin listing: equality filters then the (created_at, _id) sort/keyset range
+        mongo.db.users.create_index([('is_active', 1), ('role', 1), ('created_at', -1), ('_id', -1)], background=True)
+        # Backs the admin user search ($text); a collection may only have one text index, and
+        # without it the search falls back to a regex scan
+        try:
+            mongo.db.users.create_index([('name', 'text'), ('email', 'text')], background=True)
+        except OperationFailure as e:
+            logger.warning("⚠️ Could not create users text index, search will scan: %s", e)
+
     @staticmethod
     def create_user(email, password, role='mother', name=None, delivery_type=None, due_date=None, conditions=None):
         """Create a new user in the database"""
         if User.find_by_email(email):
             return None  # User already exists
         
-        hashed_password = generate_password_hash(password)
+        hashed_password = hash_password(password)
+        now = datetime.utcnow()
         
         user_data = {
             'email': email,
@@ -21,8 +48,8 @@ class User:
             'delivery_type': delivery_type,
             'due_date': due_date,
             'conditions': conditions or [],
-            'created_at': datetime.utcnow(),
-            'updated_at': datetime.utcnow(),
+            'created_at': now,
+            'updated_at': now,
             'is_active': True
         }
         
@@ -37,20 +64,20 @@ class User:
     @staticmethod
     def find_by_id(user_id):
         """Find a user by ID"""
-        return mongo.db.users.find_one({'_id': ObjectId(user_id)})
+        return mongo.db.users.find_one({'_id': oid(user_id)})
 
     @staticmethod
     def verify_password(user, password):
         """Verify the user's password"""
         if not user or not user.get('password'):
             return False
-        return check_password_hash(user['password'], password)
+        return check_password(user['password'], password)
 
     @staticmethod
     def update_user(user_id, update_data):
         """Update user information"""
         if 'password' in update_data:
-            update_data['password'] = generate_password_hash(update_data['password'])
+            update_data['password'] = hash_password(update_data['password'])
         
         update_data['updated_at'] = datetime.utcnow()
         
@@ -63,17 +90,17 @@ class User:
     @staticmethod
     def get_all_patients():
         """Get all users with role 'mother'"""
-        return list(mongo.db.users.find({'role': 'mother'}))
+        return list(mongo.db.users.find({'role': 'mother'}, _NO_PASSWORD))
 
     @staticmethod
     def get_all_doctors():
         """Get all users with role 'doctor'"""
-        return list(mongo.db.users.find({'role': 'doctor'}))
+        return list(mongo.db.users.find({'role': 'doctor'}, _NO_PASSWORD))
 
     @staticmethod
     def get_users_by_role(role):
         """Get all users with a specific role"""
-        return list(mongo.db.users.find({'role': role, 'is_active': True}))
+        return list(mongo.db.users.find({'role': role, 'is_active': True}, _NO_PASSWORD))
 
     @staticmethod
     def get_healthcare_providers():
@@ -82,7 +109,7 @@ class User:
         return list(mongo.db.users.find({
             'role': {'$in': provider_roles},
             'is_active': True
-        }))
+        }, _NO_PASSWORD))
 
     @staticmethod
     def update_user_role(user_id, new_role):
@@ -95,9 +122,12 @@ class User:
                     'updated_at': datetime.utcnow()
                 }}
             )
+            # Imported here: utils.permissions imports this module
+            from ..utils.permissions import clear_denied_permissions
+            clear_denied_permissions()
             return result.modified_count > 0
-        except Exception as e:
-            print(f"Error updating user role: {e}")
+        except Exception:
+            logger.exception("Error updating user role")
             return False
 
     @staticmethod
@@ -112,8 +142,8 @@ class User:
                 }}
             )
             return result.modified_count > 0
-        except Exception as e:
-            print(f"Error deactivating user: {e}")
+        except Exception:
+            logger.exception("Error deactivating user")
             return False
 
     @staticmethod
@@ -128,13 +158,13 @@ class User:
                 }}
             ]
 
-            stats = list(mongo.db.users.aggregate(pipeline))
-            total_users = mongo.db.users.count_documents({'is_active': True})
+            by_role = {stat['_id']: stat['count'] for stat in mongo.db.users.aggregate(pipeline)}
 
+            # Every active user lands in exactly one role group, so the total needs no second query
             return {
-                'total_users': total_users,
-                'by_role': {stat['_id']: stat['count'] for stat in stats}
+                'total_users': sum(by_role.values()),
+                'by_role': by_role
             }
-        except Exception as e:
-            print(f"Error getting user stats: {e}")
+        except Exception:
+            logger.exception("Error getting user stats")
             return {}
\ No newline at end of file
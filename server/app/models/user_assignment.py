@@ -1,17 +1,29 @@
+import logging
 from datetime import datetime
 from bson import ObjectId
-from ..utils.database import mongo
+from pymongo import UpdateOne
+from ..utils.database import mongo, oid
+
+logger = logging.getLogger(__name__)
 
 class UserAssignment:
     """Manage patient-provider assignments"""
     
+    @staticmethod
+    def ensure_indexes():
+        """Indexes for the active-assignment lookups from either side (idempotent)"""
+        mongo.db.user_assignments.create_index([('patient_id', 1), ('provider_id', 1), ('status', 1)], background=True)
+        mongo.db.user_assignments.create_index([('provider_id', 1), ('status', 1)], background=True)
+        mongo.db.user_assignments.create_index([('patient_id', 1), ('status', 1)], background=True)
+    
     @staticmethod
     def assign_provider_to_patient(patient_id, provider_id, assignment_type='primary'):
         """Assign a healthcare provider to a patient"""
         try:
+            patient_oid, provider_oid = oid(patient_id), oid(provider_id)
             assignment = {
-                'patient_id': ObjectId(patient_id),
-                'provider_id': ObjectId(provider_id),
+                'patient_id': patient_oid,
+                'provider_id': provider_oid,
                 'assignment_type': assignment_type,  # primary, secondary, consultant
                 'status': 'active',
                 'assigned_at': datetime.utcnow(),
@@ -21,8 +33,8 @@ class UserAssignment:
             
             # Check if assignment already exists
             existing = mongo.db.user_assignments.find_one({
-                'patient_id': ObjectId(patient_id),
-                'provider_id': ObjectId(provider_id),
+                'patient_id': patient_oid,
+                'provider_id': provider_oid,
                 'status': 'active'
             })
             
@@ -31,81 +43,96 @@ class UserAssignment:
             
             result = mongo.db.user_assignments.insert_one(assignment)
             return str(result.inserted_id)
-        except Exception as e:
-            print(f"Error assigning provider to patient: {e}")
+        except Exception:
+            logger.exception("Error assigning provider to patient")
             return None
     
     @staticmethod
     def get_patient_providers(patient_id):
         """Get all providers assigned to a patient"""
         try:
-            assignments = list(mongo.db.user_assignments.find({
-                'patient_id': ObjectId(patient_id),
-                'status': 'active'
-            }))
-            
-            # Get provider details
-            provider_ids = [assignment['provider_id'] for assignment in assignments]
-            providers = list(mongo.db.users.find({
-                '_id': {'$in': provider_ids},
-                'is_active': True
-            }))
+            # Join the active providers server-side instead of matching them up in Python
+            joined = mongo.db.user_assignments.aggregate([
+                {'$match': {'patient_id': ObjectId(patient_id), 'status': 'active'}},
+                {'$lookup': {
+                    'from': 'users',
+                    'localField': 'provider_id',
+                    'foreignField': '_id',
+                    'as': 'provider'
+                }},
+                {'$unwind': '$provider'},
+                {'$match': {'provider.is_active': True}},
+                {'$project': {
+                    'assignment_type': 1,
+                    'assigned_at': 1,
+                    'provider._id': 1,
+                    'provider.name': 1,
+                    'provider.email': 1,
+                    'provider.role': 1
+                }}
+            ])
             
-            # Combine assignment info with provider details
             result = []
-            for assignment in assignments:
-                provider = next((p for p in providers if p['_id'] == assignment['provider_id']), None)
-                if provider:
-                    result.append({
-                        'assignment_id': str(assignment['_id']),
-                        'provider_id': str(provider['_id']),
-                        'provider_name': provider.get('name', 'Unknown'),
-                        'provider_email': provider.get('email'),
-                        'provider_role': provider.get('role'),
-                        'assignment_type': assignment['assignment_type'],
-                        'assigned_at': assignment['assigned_at']
-                    })
+            for assignment in joined:
+                provider = assignment['provider']
+                result.append({
+                    'assignment_id': str(assignment['_id']),
+                    'provider_id': str(provider['_id']),
+                    'provider_name': provider.get('name', 'Unknown'),
+                    'provider_email': provider.get('email'),
+                    'provider_role': provider.get('role'),
+                    'assignment_type': assignment['assignment_type'],
+                    'assigned_at': assignment['assigned_at']
+                })
             
             return result
-        except Exception as e:
-            print(f"Error getting patient providers: {e}")
+        except Exception:
+            logger.exception("Error getting patient providers")
             return []
     
     @staticmethod
     def get_provider_patients(provider_id):
         """Get all patients assigned to a provider"""
         try:
-            assignments = list(mongo.db.user_assignments.find({
-                'provider_id': ObjectId(provider_id),
-                'status': 'active'
-            }))
-            
-            # Get patient details
-            patient_ids = [assignment['patient_id'] for assignment in assignments]
-            patients = list(mongo.db.users.find({
-                '_id': {'$in': patient_ids},
-                'is_active': True
-            }))
+            # Join the active patients server-side instead of matching them up in Python
+            joined = mongo.db.user_assignments.aggregate([
+                {'$match': {'provider_id': ObjectId(provider_id), 'status': 'active'}},
+                {'$lookup': {
+                    'from': 'users',
+                    'localField': 'patient_id',
+                    'foreignField': '_id',
+                    'as': 'patient'
+                }},
+                {'$unwind': '$patient'},
+                {'$match': {'patient.is_active': True}},
+                {'$project': {
+                    'assignment_type': 1,
+                    'assigned_at': 1,
+                    'patient._id': 1,
+                    'patient.name': 1,
+                    'patient.email': 1,
+                    'patient.delivery_type': 1,
+                    'patient.due_date': 1
+                }}
+            ])
             
-            # Combine assignment info with patient details
             result = []
-            for assignment in assignments:
-                patient = next((p for p in patients if p['_id'] == assignment['patient_id']), None)
-                if patient:
-                    result.append({
-                        'assignment_id': str(assignment['_id']),
-                        'patient_id': str(patient['_id']),
-                        'patient_name': patient.get('name', 'Unknown'),
-                        'patient_email': patient.get('email'),
-                        'assignment_type': assignment['assignment_type'],
-                        'assigned_at': assignment['assigned_at'],
-                        'delivery_type': patient.get('delivery_type'),
-                        'due_date': patient.get('due_date')
-                    })
+            for assignment in joined:
+                patient = assignment['patient']
+                result.append({
+                    'assignment_id': str(assignment['_id']),
+                    'patient_id': str(patient['_id']),
+                    'patient_name': patient.get('name', 'Unknown'),
+                    'patient_email': patient.get('email'),
+                    'assignment_type': assignment['assignment_type'],
+                    'assigned_at': assignment['assigned_at'],
+                    'delivery_type': patient.get('delivery_type'),
+                    'due_date': patient.get('due_date')
+                })
             
             return result
-        except Exception as e:
-            print(f"Error getting provider patients: {e}")
+        except Exception:
+            logger.exception("Error getting provider patients")
             return []
     
     @staticmethod
@@ -120,8 +147,8 @@ class UserAssignment:
                 }}
             )
             return result.modified_count > 0
-        except Exception as e:
-            print(f"Error removing assignment: {e}")
+        except Exception:
+            logger.exception("Error removing assignment")
             return False
     
     @staticmethod
@@ -134,67 +161,62 @@ class UserAssignment:
                 'status': 'active'
             })
             return assignment is not None
-        except Exception as e:
-            print(f"Error checking provider access: {e}")
+        except Exception:
+            logger.exception("Error checking provider access")
             return False
     
     @staticmethod
     def get_assignment_stats():
         """Get assignment statistics for admin dashboard"""
         try:
+            # One pass over the active assignments feeds every counter
             pipeline = [
                 {'$match': {'status': 'active'}},
-                {'$group': {
-                    '_id': '$assignment_type',
-                    'count': {'$sum': 1}
+                {'$facet': {
+                    'by_type': [{'$group': {'_id': '$assignment_type', 'count': {'$sum': 1}}}],
+                    'patients': [{'$group': {'_id': '$patient_id'}}, {'$count': 'n'}],
+                    'providers': [{'$group': {'_id': '$provider_id'}}, {'$count': 'n'}]
                 }}
             ]
             
-            stats = list(mongo.db.user_assignments.aggregate(pipeline))
-            
-            # Get total counts
-            total_assignments = mongo.db.user_assignments.count_documents({'status': 'active'})
-            total_patients_with_providers = len(mongo.db.user_assignments.distinct('patient_id', {'status': 'active'}))
-            total_providers_with_patients = len(mongo.db.user_assignments.distinct('provider_id', {'status': 'active'}))
+            facets = next(mongo.db.user_assignments.aggregate(pipeline))
+            assignment_types = {stat['_id']: stat['count'] for stat in facets['by_type']}
             
             return {
-                'total_assignments': total_assignments,
-                'patients_with_providers': total_patients_with_providers,
-                'providers_with_patients': total_providers_with_patients,
-                'assignment_types': {stat['_id']: stat['count'] for stat in stats}
+                'total_assignments': sum(assignment_types.values()),
+                'patients_with_providers': facets['patients'][0]['n'] if facets['patients'] else 0,
+                'providers_with_patients': facets['providers'][0]['n'] if facets['providers'] else 0,
+                'assignment_types': assignment_types
             }
-        except Exception as e:
-            print(f"Error getting assignment stats: {e}")
+        except Exception:
+            logger.exception("Error getting assignment stats")
             return {}
     
     @staticmethod
     def bulk_assign_patients(provider_id, patient_ids, assignment_type='primary'):
         """Assign multiple patients to a provider"""
         try:
-            assignments = []
-            for patient_id in patient_ids:
-                # Check if assignment already exists
-                existing = mongo.db.user_assignments.find_one({
-                    'patient_id': ObjectId(patient_id),
-                    'provider_id': ObjectId(provider_id),
-                    'status': 'active'
-                })
-                
-                if not existing:
-                    assignments.append({
-                        'patient_id': ObjectId(patient_id),
-                        'provider_id': ObjectId(provider_id),
+            provider_oid = oid(provider_id)
+            now = datetime.utcnow()
+            # Upsert on the active pair so existing assignments are left alone, in one round trip
+            ops = [
+                UpdateOne(
+                    {'patient_id': oid(patient_id), 'provider_id': provider_oid, 'status': 'active'},
+                    {'$setOnInsert': {
                         'assignment_type': assignment_type,
-                        'status': 'active',
-                        'assigned_at': datetime.utcnow(),
+                        'assigned_at': now,
                         'assigned_by': None,
                         'notes': ''
-                    })
+                    }},
+                    upsert=True
+                )
+                for patient_id in patient_ids
+            ]
             
-            if assignments:
-                result = mongo.db.user_assignments.insert_many(assignments)
-                return len(result.inserted_ids)
+            if ops:
+                result = mongo.db.user_assignments.bulk_write(ops, ordered=False)
+                return result.upserted_count
             return 0
-        except Exception as e:
-            print(f"Error bulk assigning patients: {e}")
+        except Exception:
+            logger.exception("Error bulk assigning patients")
             return 0
@@ -1,5 +1,11 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from bson import ObjectId
+from bson.errors import InvalidId
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from pymongo.errors import OperationFailure
 from ..models.user import User
 from ..models.role import Role
 from ..models.user_assignment import UserAssignment
@@ -10,6 +16,9 @@ from flask_cors import CORS
 admin_bp = Blueprint('admin', __name__)
 CORS(admin_bp)
 
+# Shared across requests for the admin stats fan-out
+_STATS_POOL = ThreadPoolExecutor(max_workers=4)
+
 @admin_bp.route('/users', methods=['GET'])
 @require_admin()
 def get_all_users():
@@ -24,33 +33,67 @@ def get_all_users():
         query = {'is_active': True}
         if role_filter:
             query['role'] = role_filter
+        total = None
         if search:
-            query['$or'] = [
-                {'name': {'$regex': search, '$options': 'i'}},
-                {'email': {'$regex': search, '$options': 'i'}}
-            ]
+            # Whole-word searches are served by the users text index; partial names and email
+            # fragments match no text terms, so they (and a missing text index) fall back to the
+            # case-insensitive substring match
+            text_query = {**query, '$text': {'$search': search}}
+            try:
+                total = mongo.db.users.count_documents(text_query)
+            except OperationFailure:
+                total = 0
+            if total:
+                query = text_query
+            else:
+                pattern = {'$regex': re.escape(search), '$options': 'i'}
+                query['$or'] = [{'name': pattern}, {'email': pattern}]
+                total = None
         
         # Get total count
-        total = mongo.db.users.count_documents(query)
+        if total is None:
+            total = mongo.db.users.count_documents(query)
         
-        # Get users with pagination
-        skip = (page - 1) * limit
-        users = list(mongo.db.users.find(query)
-                    .skip(skip)
-                    .limit(limit)
-                    .sort('created_at', -1))
+        # Get users with pagination: the (before_created_at, before_id) keyset walks the
+        # created_at index directly, while page falls back to skip for older clients.
+        # _id breaks created_at ties so users sharing a timestamp are never skipped.
+        before_created_at = request.args.get('before_created_at')
+        if before_created_at:
+            try:
+                cursor_created_at = datetime.fromisoformat(before_created_at)
+                cursor_id = ObjectId(request.args.get('before_id'))
+            except (TypeError, ValueError, InvalidId):
+                return jsonify({'error': 'before_created_at must be an ISO timestamp and before_id a user id'}), 400
+            query['$and'] = [{'$or': [
+                {'created_at': {'$lt': cursor_created_at}},
+                {'created_at': cursor_created_at, '_id': {'$lt': cursor_id}}
+            ]}]
+            skip = 0
+        else:
+            skip = (page - 1) * limit
+        # Password is dropped and _id stringified server-side, so the page needs no Python pass
+        users = list(mongo.db.users.aggregate([
+            {'$match': query},
+            {'$sort': {'created_at': -1, '_id': -1}},
+            {'$skip': skip},
+            {'$limit': limit},
+            {'$project': {'password': 0}},
+            {'$set': {'_id': {'$toString': '$_id'}}}
+        ]))
         
-        # Remove sensitive data
-        for user in users:
-            user['_id'] = str(user['_id'])
-            user.pop('password', None)
+        next_created_at = next_id = None
+        if len(users) == limit and isinstance(users[-1].get('created_at'), datetime):
+            next_created_at = users[-1]['created_at'].isoformat()
+            next_id = users[-1]['_id']
         
         return jsonify({
             'users': users,
             'total': total,
             'page': page,
             'limit': limit,
-            'total_pages': (total + limit - 1) // limit
+            'total_pages': (total + limit - 1) // limit,
+            'next_before_created_at': next_created_at,
+            'next_before_id': next_id
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -179,22 +222,20 @@ def remove_assignment(assignment_id):
 def get_admin_stats():
     """Get comprehensive admin statistics"""
     try:
-        user_stats = User.get_user_stats()
-        assignment_stats = UserAssignment.get_assignment_stats()
-        
-        # Get additional platform stats
-        from ..models.nutrition_profile import NutritionProfile
-        from ..utils.database import mongo
-        
-        nutrition_profiles = mongo.db.nutrition_profiles.count_documents({})
-        daily_checkins = mongo.db.daily_checkins.count_documents({})
+        # The four reads are independent; pymongo releases the GIL on network I/O,
+        # so fanning them out makes the latency the slowest query rather than the sum
+        user_stats = _STATS_POOL.submit(User.get_user_stats)
+        assignment_stats = _STATS_POOL.submit(UserAssignment.get_assignment_stats)
+        # Unfiltered totals come from collection metadata rather than a scan
+        nutrition_profiles = _STATS_POOL.submit(mongo.db.nutrition_profiles.estimated_document_count)
+        daily_checkins = _STATS_POOL.submit(mongo.db.daily_checkins.estimated_document_count)
         
         return jsonify({
-            'users': user_stats,
-            'assignments': assignment_stats,
+            'users': user_stats.result(),
+            'assignments': assignment_stats.result(),
             'platform_usage': {
-                'nutrition_profiles': nutrition_profiles,
-                'daily_checkins': daily_checkins
+                'nutrition_profiles': nutrition_profiles.result(),
+                'daily_checkins': daily_checkins.result()
             }
         })
     except Exception as e:
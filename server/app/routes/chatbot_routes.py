@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import get_jwt_identity
+from ..utils.auth import jwt_required_cached
 from flask_cors import cross_origin
 from ..ml_services.chatbot.rag_service import rag_service
 from ..ml_services.chatbot.gemini_service import REDACTEDservice
@@ -12,7 +13,7 @@ chatbot_bp = Blueprint('chatbot', __name__, url_prefix='/api/chatbot')
 
 @chatbot_bp.route('/initialize', methods=['POST', 'OPTIONS'])
 @cross_origin()
-@jwt_required()
+@jwt_required_cached()
 def initialize_chatbot():
     """Initialize the RAG chatbot"""
     if request.method == 'OPTIONS':
@@ -37,7 +38,7 @@ def initialize_chatbot():
 
 @chatbot_bp.route('/chat', methods=['POST', 'OPTIONS'])
 @cross_origin()
-@jwt_required()
+@jwt_required_cached()
 def chat():
     """Handle chat messages with both RAG and Hugging Face support, and store chat history."""
     if request.method == 'OPTIONS':
@@ -188,7 +189,7 @@ def chat():
 
 @chatbot_bp.route('/chats', methods=['GET'])
 @cross_origin()
-@jwt_required()
+@jwt_required_cached()
 def list_chats():
     """List chat sessions for the authenticated user (most recent first)."""
     try:
@@ -215,7 +216,7 @@ def list_chats():
 
 @chatbot_bp.route('/chats/<chat_id>', methods=['GET', 'DELETE'])
 @cross_origin()
-@jwt_required()
+@jwt_required_cached()
 def chat_detail(chat_id):
     """Get messages for a chat or delete it (soft delete can be added later)."""
     try:
@@ -250,7 +251,7 @@ def chat_detail(chat_id):
 
 @chatbot_bp.route('/settings', methods=['GET', 'POST', 'OPTIONS'])
 @cross_origin()
-@jwt_required()
+@jwt_required_cached()
 def chatbot_settings():
     """Get or update chatbot settings"""
     if request.method == 'OPTIONS':
@@ -283,7 +284,7 @@ def chatbot_settings():
 
 @chatbot_bp.route('/status', methods=['GET'])
 @cross_origin()
-@jwt_required()
+@jwt_required_cached()
 def chatbot_status():
     """Get chatbot status and health"""
     try:
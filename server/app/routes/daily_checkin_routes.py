@@ -1,12 +1,13 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import get_jwt_identity
+from app.utils.auth import jwt_required_cached
 from app.models.daily_checkin import DailyCheckin
 from flask_cors import cross_origin
 
 daily_checkin_bp = Blueprint('daily_checkin', __name__, url_prefix='/api/daily-checkin')
 
 @daily_checkin_bp.route('/save', methods=['POST'])
-@jwt_required()
+@jwt_required_cached()
 @cross_origin()
 def save_daily_checkin():
     user_id = get_jwt_identity()
@@ -25,7 +26,7 @@ def save_daily_checkin():
         return jsonify({'msg': f'Error saving daily check-in: {str(e)}'}), 500
 
 @daily_checkin_bp.route('/history', methods=['GET'])
-@jwt_required()
+@jwt_required_cached()
 @cross_origin()
 def get_daily_checkin_history():
     user_id = get_jwt_identity()
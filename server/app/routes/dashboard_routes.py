@@ -1,24 +1,51 @@
-﻿from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+﻿import logging
+from flask import Blueprint, request, jsonify, json, Response, stream_with_context
+from flask_jwt_extended import get_jwt_identity
+from app.utils.auth import jwt_required_cached
 from app.models.patient_record import PatientRecord  # Updated import
 from bson import ObjectId
 
+logger = logging.getLogger(__name__)
+
 dashboard_bp = Blueprint('dashboard', __name__)
 
 @dashboard_bp.route('/records', methods=['GET'])
-@jwt_required()
+@jwt_required_cached()
 def get_records():
     current_user = get_jwt_identity()
     records = PatientRecord.get_records(current_user['id'])
+    try:
+        # Run the query and pull the first batch before committing to a 200, so a
+        # failing query is reported as an error rather than as an empty stream
+        first = next(records, None)
+    except Exception:
+        logger.exception("Error retrieving records")
+        return jsonify({"msg": "Error retrieving records"}), 500
+    if first is None:
+        return jsonify([]), 200
     
-    for record in records:
+    def dump(record):
         record['_id'] = str(record['_id'])
         record['user_id'] = str(record['user_id'])
+        return json.dumps(record)
+    
+    def generate():
+        # Emit the JSON array one record at a time as the cursor yields batches
+        yield '[' + dump(first)
+        try:
+            for record in records:
+                yield ',' + dump(record)
+        except Exception:
+            # Headers are already sent: close the array with an error marker so the
+            # body stays valid JSON and the client can tell the list is incomplete
+            logger.exception("Records stream interrupted")
+            yield ',' + json.dumps({'error': 'Records stream interrupted'})
+        yield ']'
     
-    return jsonify(records), 200
+    return Response(stream_with_context(generate()), status=200, mimetype='application/json')
 
 @dashboard_bp.route('/add-record', methods=['POST'])
-@jwt_required()
+@jwt_required_cached()
 def add_record():
     current_user = get_jwt_identity()
     data = request.get_json()
@@ -33,13 +60,13 @@ def add_record():
     }), 201
 
 @dashboard_bp.route('/user-info', methods=['GET'])
-@jwt_required()
+@jwt_required_cached()
 def user_info():
     current_user = get_jwt_identity()
     return jsonify(current_user), 200
 
 @dashboard_bp.route('/stats', methods=['GET'])
-@jwt_required()
+@jwt_required_cached()
 def get_dashboard_stats():
     current_user = get_jwt_identity()
     
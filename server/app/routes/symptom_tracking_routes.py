@@ -30,14 +30,19 @@ def track_symptom():
 
 @symptom_tracking_bp.route('/history/<symptom_name>', methods=['GET'])
 @jwt_required()
-@cross_origin()
+@cross_origin(expose_headers=['X-History-Limit', 'X-History-Truncated'])
 def get_history(symptom_name):
     user_id = get_jwt_identity()
     limit = request.args.get('limit', type=int)
 
     try:
-        history = SymptomTracking.get_symptom_history(user_id, symptom_name, limit)
-        return jsonify(history), 200
+        # Returns at most `limit` entries (SymptomTracking.DEFAULT_HISTORY_LIMIT by default);
+        # the headers tell the client which limit applied and whether older entries were left out
+        history, truncated = SymptomTracking.get_symptom_history(user_id, symptom_name, limit)
+        response = jsonify(history)
+        response.headers['X-History-Limit'] = str(limit or SymptomTracking.DEFAULT_HISTORY_LIMIT)
+        response.headers['X-History-Truncated'] = 'true' if truncated else 'false'
+        return response, 200
     except InvalidId:
         return jsonify({'msg': 'Invalid user ID'}), 400
     except Exception as e:
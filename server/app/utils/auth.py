@@ -1,11 +1,149 @@
-﻿from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token
+﻿import logging
+import threading
+import time
+from datetime import timedelta
+from functools import wraps
+from cachetools import TTLCache
+from flask import current_app, request
+from werkzeug.security import generate_password_hash, check_password_hash
+from flask_jwt_extended import create_access_token, get_jwt, verify_jwt_in_request
+from flask_jwt_extended.config import config as _jwt_config
+
+logger = logging.getLogger(__name__)
+
+# The jwt_required_cached fast path restores the state flask-jwt-extended keeps on the request
+# context. The layout is checked against get_jwt() on the first verification; if the installed
+# release stores it elsewhere, the cache turns itself off with a warning and every request is
+# fully verified
+try:
+    from flask import _request_ctx_stack
+    from flask_jwt_extended.default_callbacks import (
+        default_blocklist_callback,
+        default_token_verification_callback,
+    )
+    _JWT_CACHE_SUPPORTED = True
+except Exception:
+    logger.warning("Cached JWT verification disabled: flask-jwt-extended internals not found")
+    _JWT_CACHE_SUPPORTED = False
+
+# Hash new passwords with argon2id (native, releases the GIL) if argon2-cffi is installed
+try:
+    from argon2 import PasswordHasher  # type: ignore
+    from argon2.exceptions import InvalidHash, VerificationError  # type: ignore
+    _argon2 = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=2)
+except Exception:
+    _argon2 = None
+
+# Pinned rather than werkzeug's default so the fallback cost does not drift with upgrades
+_FALLBACK_METHOD = 'pbkdf2:sha256:260000'
 
 def hash_password(password):
-    return generate_password_hash(password)
+    if _argon2 is not None:
+        return _argon2.hash(password)
+    return generate_password_hash(password, method=_FALLBACK_METHOD)
 
 def verify_password(stored_hash, password):
+    # Hashes created before argon2 was enabled are werkzeug pbkdf2 strings and still verify
+    if stored_hash.startswith('$argon2'):
+        if _argon2 is None:
+            return False
+        try:
+            return _argon2.verify(stored_hash, password)
+        except (VerificationError, InvalidHash):
+            return False
     return check_password_hash(stored_hash, password)
 
 def create_jwt_token(user_id):
     return create_access_token(identity=str(user_id))
+
+# Encoded token -> (decoded header, claims) of a header-borne token that already verified once.
+# Entries live at most 5s and never past the token's own exp (plus JWT_DECODE_LEEWAY).
+_VERIFIED_JWTS = TTLCache(maxsize=10000, ttl=5)
+_VERIFIED_JWTS_LOCK = threading.Lock()
+
+def _disable_jwt_cache(reason):
+    global _JWT_CACHE_SUPPORTED
+    if _JWT_CACHE_SUPPORTED:
+        _JWT_CACHE_SUPPORTED = False
+        logger.warning("Cached JWT verification disabled: %s", reason)
+    with _VERIFIED_JWTS_LOCK:
+        _VERIFIED_JWTS.clear()
+
+def _jwt_cache_usable():
+    """Only skip verification when no loader that must see every request is registered"""
+    if not _JWT_CACHE_SUPPORTED:
+        return False
+    manager = current_app.extensions['flask-jwt-extended']
+    try:
+        return (manager._token_in_blocklist_callback is default_blocklist_callback
+                and manager._token_verification_callback is default_token_verification_callback
+                and manager._user_lookup_callback is None)
+    except AttributeError:
+        _disable_jwt_cache("JWTManager callbacks not found")
+        return False
+
+def _header_token():
+    """The encoded token from the JWT header, or None if it would not be the one verified"""
+    # flask-jwt-extended takes the token from the first configured location that has one,
+    # so a header token is only known to win when headers come first
+    locations = _jwt_config.token_location
+    if not locations or locations[0] != 'headers':
+        return None
+    value = request.headers.get(_jwt_config.header_name)
+    if not value:
+        return None
+    header_type = _jwt_config.header_type
+    if header_type:
+        prefix = header_type + ' '
+        if not value.startswith(prefix):
+            return None
+        value = value[len(prefix):]
+    if not value or ' ' in value:
+        return None
+    return value
+
+def _verify_jwt_cached():
+    if request.method in _jwt_config.exempt_methods:
+        return
+    token = _header_token()
+    if token is None or not _jwt_cache_usable():
+        verify_jwt_in_request()
+        return
+
+    with _VERIFIED_JWTS_LOCK:
+        entry = _VERIFIED_JWTS.get(token)
+    if entry is not None:
+        jwt_header, jwt_data = entry
+        leeway = _jwt_config.leeway
+        if isinstance(leeway, timedelta):
+            leeway = leeway.total_seconds()
+        if jwt_data.get('exp', float('inf')) + leeway > time.time():
+            # Mirrors what verify_jwt_in_request stores; jwt_user is None because
+            # _jwt_cache_usable() guarantees no user_lookup_loader is registered
+            ctx = _request_ctx_stack.top
+            ctx.jwt_header = dict(jwt_header)
+            ctx.jwt = dict(jwt_data)
+            ctx.jwt_user = None
+            ctx.jwt_location = 'headers'
+            return
+
+    verify_jwt_in_request()
+    ctx = _request_ctx_stack.top
+    jwt_data = getattr(ctx, 'jwt', None)
+    jwt_header = getattr(ctx, 'jwt_header', None)
+    if jwt_data is None or jwt_header is None or get_jwt() is not jwt_data:
+        _disable_jwt_cache("flask-jwt-extended no longer keeps its state on the request context")
+        return
+    if getattr(ctx, 'jwt_location', None) == 'headers':
+        with _VERIFIED_JWTS_LOCK:
+            _VERIFIED_JWTS[token] = (dict(jwt_header), dict(jwt_data))
+
+def jwt_required_cached():
+    """jwt_required() that skips signature verification for a token seen in the last few seconds"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            _verify_jwt_cached()
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -1,3 +1,38 @@
-﻿from flask_pymongo import PyMongo
+﻿import functools
+import logging
+from bson import ObjectId
+from flask_pymongo import PyMongo
+
+logger = logging.getLogger(__name__)
 
 mongo = PyMongo()
+
+# Oldest server the queries run on: the breastfeeding feed summary uses $setWindowFields/$shift
+# (5.0), its insights $unionWith (4.4) and stop_feed a $$NOW pipeline update (4.2)
+MIN_SERVER_VERSION = (5, 0)
+
+
+def check_server_version():
+    """Log an error at startup if the connected MongoDB is older than MIN_SERVER_VERSION"""
+    try:
+        version = tuple(mongo.db.command('buildInfo')['versionArray'][:2])
+    except Exception:
+        logger.warning("Could not read the MongoDB server version", exc_info=True)
+        return None
+    if version < MIN_SERVER_VERSION:
+        logger.error("MongoDB %s is older than the required %s; breastfeeding summaries and insights will fail",
+                     '.'.join(map(str, version)), '.'.join(map(str, MIN_SERVER_VERSION)))
+    return version
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_oid(value):
+    return ObjectId(value)
+
+
+def oid(value):
+    """ObjectId for an id string; each distinct string is parsed once per process"""
+    if isinstance(value, ObjectId):
+        return value
+    # Only strings are cached: ObjectId(None) mints a fresh id and must not be reused
+    return _parse_oid(value) if isinstance(value, str) else ObjectId(value)
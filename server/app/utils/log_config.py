@@ -0,0 +1,25 @@
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+_listener = None
+
+
+def configure_logging(level=logging.INFO):
+    """Route the app's loggers through a queue so request threads never block on stream writes"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s [%(name)s] %(message)s'))
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    # 'app' is the package logger: every module's getLogger(__name__) propagates here
+    app_logger = logging.getLogger('app')
+    app_logger.addHandler(QueueHandler(log_queue))
+    app_logger.setLevel(level)
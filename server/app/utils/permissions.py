@@ -1,9 +1,32 @@
+import logging
+import threading
 from functools import wraps
-from flask import jsonify, request
+from cachetools import TTLCache
+from flask import jsonify, request, g
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from ..models.role import Role
 from ..models.user import User
 
+logger = logging.getLogger(__name__)
+
+# Recently denied (user_id, role, permission) triples; repeat 403s skip the permission lookup
+_DENY_CACHE = TTLCache(maxsize=10000, ttl=30)
+_DENY_LOCK = threading.Lock()
+
+def clear_denied_permissions():
+    """Forget cached denials; call whenever a user's role or a role's permissions change"""
+    with _DENY_LOCK:
+        _DENY_CACHE.clear()
+
+def _role_has_permission(user_role, permission):
+    """Role.has_permission, memoized on flask.g for the rest of the current request"""
+    checked = g.setdefault('_perm_cache', {})
+    key = (user_role, permission)
+    allowed = checked.get(key)
+    if allowed is None:
+        allowed = checked[key] = Role.has_permission(user_role, permission)
+    return allowed
+
 def require_permission(permission):
     """Decorator to require specific permission"""
     def decorator(f):
@@ -17,7 +40,13 @@ def require_permission(permission):
                 user_role = claims.get('role', 'mother')
                 
                 # Check permission
-                if not Role.has_permission(user_role, permission):
+                deny_key = (user_id, user_role, permission)
+                with _DENY_LOCK:
+                    denied = deny_key in _DENY_CACHE
+                if denied or not _role_has_permission(user_role, permission):
+                    if not denied:
+                        with _DENY_LOCK:
+                            _DENY_CACHE[deny_key] = True
                     return jsonify({
                         'error': 'Insufficient permissions',
                         'required_permission': permission,
@@ -25,7 +54,7 @@ def require_permission(permission):
                     }), 403
                 
                 return f(*args, **kwargs)
-            except Exception as e:
+            except Exception:
                 return jsonify({'error': 'Permission check failed'}), 500
         return decorated_function
     return decorator
@@ -53,7 +82,7 @@ def require_role(allowed_roles):
                     }), 403
                 
                 return f(*args, **kwargs)
-            except Exception as e:
+            except Exception:
                 return jsonify({'error': 'Role check failed'}), 500
         return decorated_function
     return decorator
@@ -92,8 +121,8 @@ def can_access_patient_data(user_role, user_id, target_patient_id):
             return True
         
         return False
-    except Exception as e:
-        print(f"Error checking patient data access: {e}")
+    except Exception:
+        logger.exception("Error checking patient data access")
         return False
 
 def patient_data_access_required():
@@ -133,7 +162,7 @@ def patient_data_access_required():
                     }), 403
                 
                 return f(*args, **kwargs)
-            except Exception as e:
+            except Exception:
                 return jsonify({'error': 'Patient data access check failed'}), 500
         return decorated_function
     return decorator
@@ -151,8 +180,8 @@ class PermissionChecker:
             
             user_role = user.get('role', 'mother')
             return Role.has_permission(user_role, permission)
-        except Exception as e:
-            print(f"Error checking user permission: {e}")
+        except Exception:
+            logger.exception("Error checking user permission")
             return False
     
     @staticmethod
@@ -165,8 +194,8 @@ class PermissionChecker:
             
             user_role = user.get('role', 'mother')
             return Role.get_user_permissions(user_role)
-        except Exception as e:
-            print(f"Error getting user permissions: {e}")
+        except Exception:
+            logger.exception("Error getting user permissions")
             return []
     
     @staticmethod
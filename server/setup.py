@@ -29,6 +29,8 @@ setup(
         'numpy>=1.21.2',
         'pandas>=1.3.3',
         'joblib>=1.1.0',
+        'cachetools>=4.2',
+        'argon2-cffi>=21.1',
     ],
     python_requires='>=3.8,<3.12',
     setup_requires=['setuptools>=65.5.1', 'wheel>=0.38.0'],
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test that jwt_required_cached restores the same JWT state on a cache hit as a full verification
+"""
+
+import sys
+from pathlib import Path
+
+from flask import Flask, jsonify
+from flask_jwt_extended import JWTManager, create_access_token, get_jwt, get_jwt_header, get_jwt_identity
+
+# Make the app package importable when run from anywhere
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.utils import auth
+
+
+def _make_app(**config):
+    app = Flask(__name__)
+    app.config['JWT_SECRET_KEY'] = 'test-secret-key-for-jwt-cache-check'
+    app.config.update(config)
+    JWTManager(app)
+
+    @app.route('/whoami', methods=['GET'])
+    @auth.jwt_required_cached()
+    def whoami():
+        return jsonify({
+            'identity': get_jwt_identity(),
+            'claims': get_jwt(),
+            'header': get_jwt_header()
+        })
+
+    return app
+
+
+def _count_verifications():
+    calls = []
+    original = auth.verify_jwt_in_request
+
+    def counting(*args, **kwargs):
+        calls.append(1)
+        return original(*args, **kwargs)
+
+    auth.verify_jwt_in_request = counting
+    return calls, original
+
+
+def test_cache_hit_matches_miss():
+    """get_jwt()/get_jwt_identity() return the same values on a hit as on the verifying miss"""
+    app = _make_app()
+    client = app.test_client()
+    with app.app_context():
+        token = create_access_token(identity='user-123', additional_claims={'role': 'admin'})
+    headers = {'Authorization': f'Bearer {token}'}
+
+    auth._VERIFIED_JWTS.clear()
+    calls, original = _count_verifications()
+    try:
+        miss = client.get('/whoami', headers=headers)
+        hit = client.get('/whoami', headers=headers)
+    finally:
+        auth.verify_jwt_in_request = original
+
+    assert miss.status_code == 200 and hit.status_code == 200
+    assert len(calls) == (1 if auth._JWT_CACHE_SUPPORTED else 2)
+    assert hit.get_json() == miss.get_json()
+    assert hit.get_json()['identity'] == 'user-123'
+    assert hit.get_json()['claims']['role'] == 'admin'
+
+
+def test_other_token_locations_always_verify():
+    """A header token is not served from the cache when another location is checked first"""
+    app = _make_app(JWT_TOKEN_LOCATION=['cookies', 'headers'])
+    client = app.test_client()
+    with app.app_context():
+        token = create_access_token(identity='user-123')
+    headers = {'Authorization': f'Bearer {token}'}
+
+    auth._VERIFIED_JWTS.clear()
+    calls, original = _count_verifications()
+    try:
+        first = client.get('/whoami', headers=headers)
+        second = client.get('/whoami', headers=headers)
+    finally:
+        auth.verify_jwt_in_request = original
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert len(calls) == 2
+    assert not auth._VERIFIED_JWTS
+
+
+def test_invalid_tokens_still_rejected():
+    """Missing and malformed tokens take the normal flask-jwt-extended error paths"""
+    app = _make_app()
+    client = app.test_client()
+    auth._VERIFIED_JWTS.clear()
+
+    assert client.get('/whoami').status_code == 401
+    assert client.get('/whoami', headers={'Authorization': 'Bearer not-a-token'}).status_code == 422
+
+
+if __name__ == '__main__':
+    print("🧪 Testing cached JWT verification")
+    test_cache_hit_matches_miss()
+    test_other_token_locations_always_verify()
+    test_invalid_tokens_still_rejected()
+    print("✅ Cached JWT verification matches full verification")